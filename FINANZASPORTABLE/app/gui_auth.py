@@ -5,46 +5,41 @@ GUI de autenticación para Finanza.
 - Login
 
 Después de login exitoso:
-- Cierra esta ventana
-- Lanza en OTRO proceso: `python -m app.gui_mp`
-  usando el mismo intérprete (venv) y agregando ./src al PYTHONPATH.
+- Oculta esta ventana
+- Abre app.gui_mp.MPApp en el MISMO proceso, sobre esta misma raíz de Tk y
+  con el Usuario autenticado (app.gui_mp ya quedó importado mientras se
+  completaba el login, así que el tablero aparece enseguida).
 """
 
+import importlib
 import os
 import sys
-import subprocess
 import tkinter as tk
 from tkinter import messagebox
 
 from finanzasportable.auth import registrar_usuario, confirmar_cuenta, login
+from finanzasportable.auth import hashing
 
 
-def lanzar_gui_finanza():
+def lanzar_gui_finanza(master: tk.Tk, usuario):
     """
-    Lanza la GUI principal de Finanza en otro proceso:
-        python -m app.gui_mp
-
-    Usa:
-    - el mismo intérprete (sys.executable)
-    - agrega ./src al PYTHONPATH
+    Abre la GUI principal de Finanza (app.gui_mp.MPApp) como Toplevel de
+    'master', en este proceso. Devuelve la ventana o None si falló.
     """
     # Directorio raíz del proyecto (donde está este archivo dentro de app/)
     root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    src_dir = os.path.join(root_dir, "src")
-
-    env = os.environ.copy()
-    # Prepend ./src al PYTHONPATH
-    env["PYTHONPATH"] = src_dir + os.pathsep + env.get("PYTHONPATH", "")
-
-    cmd = [sys.executable, "-m", "app.gui_mp"]
+    if root_dir not in sys.path:
+        sys.path.insert(0, root_dir)
     try:
-        subprocess.Popen(cmd, env=env)
+        gui_mp = importlib.import_module("app.gui_mp")
+        return gui_mp.main(master, usuario)
     except Exception as exc:
-        print("[ERROR] No se pudo lanzar app.gui_mp:", exc)
+        print("[ERROR] No se pudo abrir app.gui_mp:", exc)
         messagebox.showerror(
             "Error",
             f"No se pudo abrir la GUI principal (app.gui_mp):\n{exc}"
         )
+        return None
 
 
 class AuthApp(tk.Tk):
@@ -56,6 +51,32 @@ class AuthApp(tk.Tk):
 
         self._frame_actual = None
         self.cambiar_a_login()
+        # Con la ventana ya dibujada, se importa la GUI principal (ttkbootstrap
+        # y servicios) mientras el usuario escribe sus datos.
+        self.after(200, self._precargar_gui_finanza)
+
+    def _precargar_gui_finanza(self):
+        try:
+            importlib.import_module("app.gui_mp")
+        except Exception:
+            pass  # lanzar_gui_finanza reintenta y muestra el error
+
+    def esperar(self, future, on_done, on_error, ms: int = 30):
+        """Sondea 'future' con after(): los callbacks corren en el hilo de Tk."""
+        if not future.done():
+            self.after(ms, self.esperar, future, on_done, on_error, ms)
+            return
+        self.configure(cursor="")
+        exc = future.exception()
+        if exc is not None:
+            on_error(exc)
+        else:
+            on_done(future.result())
+
+    def en_segundo_plano(self, fn, *args, on_done, on_error):
+        """Corre fn en el pool del KDF (hashear/verificar no congela la ventana)."""
+        self.configure(cursor="watch")
+        self.esperar(hashing.en_segundo_plano(fn, *args), on_done, on_error)
 
     def cambiar_frame(self, nuevo_frame_cls):
         if self._frame_actual is not None:
@@ -71,19 +92,13 @@ class AuthApp(tk.Tk):
 
     def on_login_exitoso(self, usuario):
         """
-        - Informa login OK
-        - Cierra esta ventana
-        - Lanza app.gui_mp en otro proceso
+        - Oculta esta ventana (sigue siendo la raíz de Tk)
+        - Abre MPApp en este proceso con el usuario autenticado
         """
-        messagebox.showinfo(
-            "Login OK",
-            f"Usuario autenticado:\n{usuario.email}\n\n"
-            "Se abrirá la GUI principal de Finanza."
-        )
-        # Cerramos esta ventana
-        self.destroy()
-        # Lanzamos la GUI principal
-        lanzar_gui_finanza()
+        self.usuario = usuario
+        self.withdraw()
+        if lanzar_gui_finanza(self, usuario) is None:
+            self.deiconify()
 
 
 class LoginFrame(tk.Frame):
@@ -108,7 +123,8 @@ class LoginFrame(tk.Frame):
         btn_frame = tk.Frame(self)
         btn_frame.pack(pady=10)
 
-        tk.Button(btn_frame, text="Iniciar sesión", command=self.do_login).grid(row=0, column=0, padx=5)
+        self.btn_login = tk.Button(btn_frame, text="Iniciar sesión", command=self.do_login)
+        self.btn_login.grid(row=0, column=0, padx=5)
         tk.Button(btn_frame, text="Registrarse", command=self.master.cambiar_a_registro).grid(row=0, column=1, padx=5)
 
     def do_login(self):
@@ -119,13 +135,14 @@ class LoginFrame(tk.Frame):
             messagebox.showwarning("Datos incompletos", "Ingresá email y contraseña.")
             return
 
-        try:
-            usuario = login(email, password)
-        except Exception as exc:
+        self.btn_login.configure(state="disabled")
+
+        def error(exc):
+            self.btn_login.configure(state="normal")
             messagebox.showerror("Error de login", str(exc))
-            return
 
-        self.master.on_login_exitoso(usuario)
+        self.master.en_segundo_plano(login, email, password,
+                                     on_done=self.master.on_login_exitoso, on_error=error)
 
 
 class RegistroFrame(tk.Frame):
@@ -173,19 +190,22 @@ class RegistroFrame(tk.Frame):
             messagebox.showwarning("Contraseña", "Las contraseñas no coinciden.")
             return
 
-        try:
+        def registrar():
             token = registrar_usuario(nombre, email, password)
             # Para el TP, simulamos que el usuario hace clic en el enlace del mail:
             confirmar_cuenta(token.token)
-        except Exception as exc:
+
+        def listo(_):
+            messagebox.showinfo(
+                "Registro exitoso",
+                "Cuenta creada y confirmada correctamente.\nAhora podés iniciar sesión."
+            )
+            self.master.cambiar_a_login()
+
+        def error(exc):
             messagebox.showerror("Error al registrar", str(exc))
-            return
 
-        messagebox.showinfo(
-            "Registro exitoso",
-            "Cuenta creada y confirmada correctamente.\nAhora podés iniciar sesión."
-        )
-        self.master.cambiar_a_login()
+        self.master.en_segundo_plano(registrar, on_done=listo, on_error=error)
 
 
 def main():
@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import sys, json, tkinter as tk
+from app import profiling  # primero: mide los imports de abajo (--profile-startup)
+
+import sys, json, itertools, tkinter as tk
 from tkinter import ttk, messagebox
 from pathlib import Path
 from datetime import date, datetime
+profiling.marca("import stdlib/tkinter")
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
+profiling.marca("import ttkbootstrap")
 
 # --- Rutas y sys.path para src/ ---
 ROOT = Path(__file__).resolve().parents[1]
@@ -15,28 +19,23 @@ SRC  = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
+# Los servicios de abajo no cargan pandas/openpyxl: solo services.importer
+# los usa, y los importa recién al leer o escribir un archivo.
+
 # --- Servicios (con fallbacks) ---
 from finanzasportable.services.db import (
     connect, ensure_schema, db_path_general, db_path_year, db_path_month,
-    clone_core_from_general, db_empty_of_core_tables
+    db_exists, core_source, ensure_partition
 )
+from finanzasportable.utils.formats import to_cents
 
-# Fallbacks si faltan servicios opcionales
-try:
-    from finanzasportable.services.transactions import listar_transacciones
-except Exception:
-    def listar_transacciones(db_path: Path):
-        # id, posted_at, desc, amount, account_name
-        with connect(db_path) as con:
-            rows = con.execute("""
-                SELECT t.id, t.posted_at, t.description, t.amount, a.name
-                FROM transactions t
-                JOIN account a ON a.id = t.account_id
-                ORDER BY t.posted_at DESC, t.id DESC
-                LIMIT 500
-            """).fetchall()
-        return rows
+from finanzasportable.services.transactions import (
+    contar_transacciones, listar_transacciones, siguiente_cursor,
+)
 
+from app.tasks import TaskRunner
+
+# Fallbacks si faltan servicios opcionales
 try:
     from finanzasportable.services.balances import listar_saldos_por_cuenta, total_saldo
 except Exception:
@@ -44,7 +43,7 @@ except Exception:
         with connect(db_path) as con:
             rows = con.execute("""
                 SELECT a.id, a.name, a.currency,
-                       IFNULL(SUM(t.amount), 0.0) AS balance,
+                       IFNULL(SUM(t.amount), 0) AS balance,
                        a.metadata
                 FROM account a
                 LEFT JOIN transactions t ON t.account_id = a.id
@@ -52,28 +51,123 @@ except Exception:
                 ORDER BY a.name
             """).fetchall()
         return rows
-    def total_saldo(db_path: Path) -> float:
+    def total_saldo(db_path: Path) -> int:
         with connect(db_path) as con:
-            r = con.execute("SELECT IFNULL(SUM(amount),0.0) FROM transactions").fetchone()
-        return float(r[0] or 0.0)
+            r = con.execute("SELECT IFNULL(SUM(amount),0) FROM transactions").fetchone()
+        return int(r[0] or 0)
+profiling.marca("import servicios")
 
-# --- Helpers de formato ---
-def money(value: float, currency: str = "ARS") -> str:
+# --- Helpers de formato (los montos viajan en centavos enteros) ---
+def money(cents: int, currency: str = "ARS") -> str:
     try:
-        v = float(value)
+        c = int(cents)
     except Exception:
-        v = 0.0
-    s = f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        c = 0
+    units, frac = divmod(abs(c), 100)
+    s = ("-" if c < 0 else "") + f"{units:,}".replace(",", ".") + f",{frac:02d}"
     return f"$ {s} {currency}" if currency else f"$ {s}"
 
-def parse_amount(s: str) -> float:
-    if s is None: return 0.0
+def parse_amount(s: str) -> int:
+    """Texto en formato ES ("1.234,56") → centavos; 0 si no se entiende."""
+    if s is None: return 0
     s = str(s).strip().replace("$", "").replace(" ", "")
     s = s.replace(".", "").replace(",", ".")
     try:
-        return float(s)
+        return to_cents(s)
     except Exception:
-        return 0.0
+        return 0
+
+# --- Carga de datos (corre en hilos de TaskRunner: no toca widgets) ---
+def preparar_base(db_path: Path) -> None:
+    """
+    Migra el esquema de una base año/mes que ya existe. Las que no existen
+    se leen como vacías y se crean recién al escribir (ensure_partition):
+    recorrer meses con los spinbox no genera archivos.
+    """
+    if db_exists(db_path):
+        ensure_schema(db_path)
+
+def cargar_tablero(db_path: Path, page_size: int) -> dict:
+    """Todo lo que necesita refresh_all: saldos, total y cantidad/primera página de actividad."""
+    preparar_base(db_path)
+    activity_total = contar_transacciones(db_path)
+    return {
+        "path": db_path,
+        "balances": listar_saldos_por_cuenta(db_path),
+        "total": total_saldo(db_path),
+        "activity_total": activity_total,
+        "first_page": listar_transacciones(db_path, page_size=page_size) if activity_total else [],
+    }
+
+# --- Escrituras (también en hilos de TaskRunner: la primera escritura en un
+# mes crea la base, la migra y clona el núcleo en ensure_partition) ---
+def _institucion_generica(con) -> int:
+    con.execute("INSERT OR IGNORE INTO institution(name) VALUES (?)", ("Genérica",))
+    row = con.execute("SELECT id FROM institution WHERE name=?", ("Genérica",)).fetchone()
+    return int(row[0])
+
+def crear_cuenta(db_path: Path, nombre: str, tipo: str, moneda: str) -> None:
+    ensure_partition(db_path)
+    with connect(db_path) as con:
+        con.execute(
+            "INSERT INTO account(institution_id, name, type, currency, metadata) VALUES (?,?,?,?,?)",
+            (_institucion_generica(con), nombre, tipo, moneda, json.dumps({"position": 10**9}))
+        )
+
+def borrar_cuenta(db_path: Path, nombre: str) -> None:
+    ensure_partition(db_path)
+    with connect(db_path) as con:
+        con.execute("DELETE FROM account WHERE name=?", (nombre,))
+
+def crear_categoria(db_path: Path, nombre: str) -> None:
+    ensure_partition(db_path)
+    with connect(db_path) as con:
+        con.execute("INSERT OR IGNORE INTO category(name) VALUES (?)", (nombre,))
+
+def borrar_categoria(db_path: Path, nombre: str) -> None:
+    ensure_partition(db_path)
+    with connect(db_path) as con:
+        con.execute("DELETE FROM category WHERE name=?", (nombre,))
+
+def guardar_movimiento(db_path: Path, account_id: int, posted_at: str, description: str, amount: int) -> None:
+    ensure_partition(db_path)
+    with connect(db_path) as con:
+        row = con.execute("SELECT currency FROM account WHERE id=?", (account_id,)).fetchone()
+        if not row: raise RuntimeError("Cuenta no encontrada.")
+        con.execute(
+            "INSERT INTO transactions(account_id, posted_at, description, amount, currency) VALUES (?,?,?,?,?)",
+            (account_id, posted_at, description, amount, row[0])
+        )
+
+def borrar_movimientos(db_path: Path, ids: list[int]) -> None:
+    if not db_exists(db_path):
+        return
+    with connect(db_path) as con:
+        con.executemany("DELETE FROM transactions WHERE id=?", [(i,) for i in ids])
+
+def listar_cuentas(db_path: Path) -> list[dict]:
+    """Cuentas de la base (o de la general si es virtual); sin ninguna de las dos, vacío."""
+    src = core_source(db_path)
+    if not db_exists(src):
+        return []
+    preparar_base(src)
+    with connect(src) as con:
+        rows = con.execute("SELECT id, name, currency FROM account ORDER BY name").fetchall()
+    return [{"id":r[0],"name":r[1],"currency":r[2]} for r in rows]
+
+def listar_categorias(db_path: Path) -> list[tuple]:
+    """Nombres de categoría, con el mismo origen que listar_cuentas."""
+    src = core_source(db_path)
+    if not db_exists(src):
+        return []
+    preparar_base(src)
+    with connect(src) as con:
+        return con.execute("SELECT name FROM category ORDER BY name").fetchall()
+
+def cargar_paginas(db_path: Path, pedidas: dict, page_size: int):
+    """Trae las páginas {k: (cursor, filas a saltear)} pedidas por VirtualActivity."""
+    return db_path, {k: listar_transacciones(db_path, after=c, skip=skip, page_size=page_size)
+                     for k, (c, skip) in pedidas.items()}
 
 # ================== APP ==================
 
@@ -85,9 +179,199 @@ def build_section(parent, title):
     frm_body.pack(fill="both", expand=True)
     return frm_wrap, frm_body
 
-class MPApp(tb.Window):
-    def __init__(self):
-        super().__init__(title="Finanzas Portable", themename="darkly")
+class VirtualActivity:
+    """
+    Listado virtual de movimientos sobre una Treeview: en la tabla solo están
+    las filas visibles; el resto se pide por páginas (keyset) al servicio de
+    transacciones y se guarda un buffer acotado de páginas alrededor.
+    La barra de scroll representa el total de filas, no los ítems de la tabla.
+    """
+    PAGE_SIZE = 200
+    MAX_PAGES = 6          # buffer de páginas en memoria
+    ROW_HEIGHT = 20        # alto aproximado de fila (px) para calcular lo visible
+
+    def __init__(self, tv: ttk.Treeview, scrollbar: ttk.Scrollbar, runner: TaskRunner):
+        self.tv = tv
+        self.sb = scrollbar
+        self.runner = runner
+        self.db_path: Path | None = None
+        self.total = 0
+        self.cursors: dict[int, tuple | None] = {0: None}   # página -> cursor, los ya conocidos
+        self.pages: dict[int, list] = {}
+        self.shown: dict[str, tuple] = {}   # iid -> (values, tag) hoy en la tabla
+        self.offset = 0
+        self.visible = int(tv.cget("height") or 18)
+
+        self.sb.configure(command=self.yview)
+        self.tv.bind("<Configure>", self._on_resize, add="+")
+        self.tv.bind("<MouseWheel>", self._on_wheel)
+        self.tv.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.tv.bind("<Button-5>", lambda e: self._scroll_rows(3))
+
+    # --- datos ---
+    def load(self, db_path: Path, total: int, first_page: list | None = None):
+        """
+        Usa el total ya contado en segundo plano (cargar_tablero). Si es la misma
+        base se conserva la posición de scroll, así render() solo aplica la
+        diferencia; si cambió de base vuelve al principio. Los cursores de
+        página se olvidan (pudo haber escrituras) y se vuelven a conocer a
+        medida que llegan las páginas.
+        """
+        self.runner.cancel("activity-page")
+        same_db = db_path == self.db_path
+        self.db_path = db_path
+        self.total = total
+        self.cursors = {0: None}
+        self.pages.clear()
+        if first_page is not None:
+            self._store(0, first_page)
+        self.offset = max(0, min(self.offset, total - self.visible)) if same_db else 0
+        self.render()
+
+    def _store(self, k: int, rows: list):
+        self.pages.pop(k, None)
+        self.pages[k] = rows  # al final: la más recientemente usada
+        cursor = siguiente_cursor(rows, self.PAGE_SIZE)
+        if cursor is not None:
+            self.cursors[k + 1] = cursor
+        while len(self.pages) > self.MAX_PAGES:
+            self.pages.pop(next(iter(self.pages)))
+
+    def _needed_pages(self) -> range:
+        start, stop = self.offset, min(self.offset + self.visible, self.total)
+        if stop <= start:
+            return range(0)
+        return range(start // self.PAGE_SIZE, (stop - 1) // self.PAGE_SIZE + 1)
+
+    def window_rows(self) -> list:
+        start, stop = self.offset, min(self.offset + self.visible, self.total)
+        rows = []
+        for k in self._needed_pages():
+            base = k * self.PAGE_SIZE
+            page = self.pages[k]
+            self._store(k, page)
+            rows.extend(page[max(start - base, 0):stop - base])
+        return rows
+
+    def _fetch_missing(self) -> bool:
+        """
+        Pide las páginas que faltan. Devuelve True si quedó una carga en curso.
+        Una página sin cursor conocido (un salto con la barra) se pide desde
+        el cursor conocido más cercano, salteando las filas intermedias.
+        """
+        missing = {}
+        for k in self._needed_pages():
+            if k not in self.pages:
+                base = max(j for j in self.cursors if j <= k)
+                missing[k] = (self.cursors[base], (k - base) * self.PAGE_SIZE)
+        if not missing:
+            return False
+        # Una sola carga en curso: si el usuario sigue scrolleando, la vieja se descarta
+        self.runner.submit("activity-page", cargar_paginas, self.db_path, missing, self.PAGE_SIZE,
+                           on_done=self._on_pages)
+        return True
+
+    def _on_pages(self, result):
+        db_path, pages = result
+        if db_path != self.db_path:
+            return
+        for k, rows in pages.items():
+            self._store(k, rows)
+        self.render()
+
+    # --- vista ---
+    def render(self):
+        if self._fetch_missing():
+            self._update_scrollbar()
+            return  # se vuelve a dibujar cuando llegan las páginas
+        self._apply_diff(self.window_rows())
+        self._update_scrollbar()
+
+    def _apply_diff(self, rows: list):
+        """
+        Lleva la tabla a 'rows' tocando solo lo que cambió (por id de
+        transacción): un delete para las que salen, insert para las nuevas,
+        item() si cambiaron sus valores y move() si cambiaron de lugar.
+        """
+        wanted = [str(r[0]) for r in rows]
+        wanted_set = set(wanted)
+        order = list(self.tv.get_children())
+        gone = [iid for iid in order if iid not in wanted_set]
+        if gone:
+            self.tv.delete(*gone)
+            for iid in gone:
+                self.shown.pop(iid, None)
+            order = [iid for iid in order if iid in wanted_set]
+
+        for index, (tx_id, posted_at, desc, amount, acc_name) in enumerate(rows):
+            iid = wanted[index]
+            tag  = "ingreso" if amount > 0 else "egreso" if amount < 0 else "neutro"
+            tipo = "Ingreso" if amount > 0 else "Egreso" if amount < 0 else "—"
+            view = ((posted_at, desc or "", tipo, money(amount), acc_name), tag)
+            if iid not in self.shown:
+                self.tv.insert("", index, iid=iid, values=view[0], tags=(tag,))
+                order.insert(index, iid)
+            else:
+                if self.shown[iid] != view:
+                    self.tv.item(iid, values=view[0], tags=(tag,))
+                if order[index] != iid:
+                    self.tv.move(iid, "", index)
+                    order.remove(iid)
+                    order.insert(index, iid)
+            self.shown[iid] = view
+
+    def _update_scrollbar(self):
+        if self.total <= 0:
+            self.sb.set(0.0, 1.0)
+            return
+        first = self.offset / self.total
+        last = min(self.offset + self.visible, self.total) / self.total
+        self.sb.set(first, last)
+
+    def _move_to(self, offset: int):
+        offset = max(0, min(int(offset), max(self.total - self.visible, 0)))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def _scroll_rows(self, n: int):
+        self._move_to(self.offset + n)
+        return "break"
+
+    def yview(self, *args):
+        """Reemplaza Treeview.yview como 'command' de la barra de scroll."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._move_to(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible if args[2] == "pages" else 1)
+            self._move_to(self.offset + step)
+
+    def _on_wheel(self, event):
+        return self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // self.ROW_HEIGHT - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.offset = max(0, min(self.offset, self.total - visible))
+            if self.db_path is not None:
+                self.render()
+
+class MPApp(tb.Toplevel):
+    """
+    Ventana principal. Es un Toplevel sobre la raíz de Tk de quien la abre
+    (gui_auth la abre tras el login, en el mismo proceso y con el usuario
+    autenticado); al cerrarla se cierra la raíz y con ella la aplicación.
+    """
+    THEME = "darkly"
+
+    def __init__(self, master: tk.Misc, usuario=None):
+        self.usuario = usuario
+        title = "Finanzas Portable" + (f" — {usuario.nombre}" if usuario is not None else "")
+        super().__init__(title=title, master=master)
+        tb.Style().theme_use(self.THEME)
         self.geometry("1100x680")
 
         today = date.today()
@@ -96,12 +380,36 @@ class MPApp(tb.Window):
         self.scope_month = tk.IntVar(value=today.month)
 
         self.db_path = self.current_path()
+        self.tasks = TaskRunner(self, on_busy=self._set_loading)
+        self._escrituras = itertools.count(1)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self._build_header()
         self._build_body()
-        self.prepare_db()
         self.refresh_all()
 
+    def _on_close(self):
+        self.tasks.shutdown()
+        self.master.destroy()
+
+    def _set_loading(self, busy: bool):
+        self.loading_var.set("Cargando…" if busy else "")
+        self.configure(cursor="watch" if busy else "")
+
+    def _on_load_error(self, exc: BaseException):
+        messagebox.showerror("Error", f"No se pudieron cargar los datos:\n{exc}", parent=self)
+
+    def escribir(self, fn, *args, on_done=None, parent=None, titulo: str = "Error"):
+        """
+        Corre la escritura fn(db_path, *args) en segundo plano. Cada una lleva
+        su propia clave: una escritura nueva nunca cancela a otra pendiente.
+        """
+        def on_error(exc: BaseException):
+            ventana = parent if parent is not None and parent.winfo_exists() else self
+            messagebox.showerror(titulo, str(exc), parent=ventana)
+        self.tasks.submit(f"write-{next(self._escrituras)}", fn, self.db_path, *args,
+                          on_done=on_done, on_error=on_error)
+
     # --- DB / Alcance ---
     def current_path(self) -> Path:
         m = self.scope_mode.get()
@@ -112,16 +420,6 @@ class MPApp(tb.Window):
         else:
             return db_path_month(self.scope_year.get(), self.scope_month.get())
 
-    def prepare_db(self):
-        """Asegura esquema y clona core desde GENERAL si falta (para año/mes)."""
-        self.db_path = self.current_path()
-        ensure_schema(self.db_path)
-        try:
-            if db_empty_of_core_tables(self.db_path):
-                clone_core_from_general(self.db_path)
-        except Exception:
-            pass
-
     # --- UI: Header ---
     def _build_header(self):
         hdr = ttk.Frame(self, padding=10)
@@ -133,6 +431,8 @@ class MPApp(tb.Window):
         ttk.Label(left, text="Disponible", font=("Helvetica", 10, "bold")).pack(anchor="center")
         self.total_var = tk.StringVar(value="$ 0,00")
         ttk.Label(left, textvariable=self.total_var, font=("Helvetica", 28, "bold")).pack(anchor="center")
+        self.loading_var = tk.StringVar(value="")
+        ttk.Label(left, textvariable=self.loading_var, foreground="#cbd5e1").pack(anchor="center")
 
         # Derecha: selector de ámbito + botones
         right = ttk.Frame(hdr)
@@ -173,7 +473,6 @@ class MPApp(tb.Window):
         self.scope_mode.set("year" if sel=="Año" else "month")
         self.sp_year.configure(state="normal" if self.scope_mode.get() in ("year","month") else "disabled")
         self.sp_month.configure(state="normal" if self.scope_mode.get()=="month" else "disabled")
-        self.prepare_db()
         self.refresh_all()
 
     # --- UI: Body ---
@@ -185,6 +484,9 @@ class MPApp(tb.Window):
         left_wrap.pack(side=tk.LEFT, fill=tk.Y)
         self.left_list = ttk.Frame(left_body)
         self.left_list.pack(fill=tk.BOTH, expand=True)
+        self._cards_box = None
+        self._cards: dict[int, dict] = {}     # account_id -> tarjeta de saldo
+        self._card_order: list[int] = []
 
         center_wrap, center_body = build_section(body, "Tu última actividad")
         center_wrap.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10,0))
@@ -203,22 +505,13 @@ class MPApp(tb.Window):
         self.tv.tag_configure("egreso",  foreground="#e02424")
         self.tv.tag_configure("neutro",  foreground="#cbd5e1")
 
-        sc = ttk.Scrollbar(center_body, orient="vertical", command=self.tv.yview)
-        self.tv.configure(yscrollcommand=sc.set)
+        # Scroll virtual: la barra recorre todos los movimientos, no solo los ítems
+        sc = ttk.Scrollbar(center_body, orient="vertical")
         sc.place(relx=1.0, rely=0, relheight=1.0, anchor="ne")
+        self.activity = VirtualActivity(self.tv, sc, runner=self.tasks)
 
         # Atajo de teclado: Supr para eliminar fila seleccionada
         self.tv.bind("<Delete>", lambda e: self.delete_selected_tx())
-    def _ensure_generic_institution(self, con) -> int:
-        con.execute("INSERT OR IGNORE INTO institution(name) VALUES (?)", ("Genérica",))
-        row = con.execute("SELECT id FROM institution WHERE name=?", ("Genérica",)).fetchone()
-        return int(row[0])
-
-    def get_accounts(self):
-        with connect(self.db_path) as con:
-            rows = con.execute("SELECT id, name, currency FROM account ORDER BY name").fetchall()
-        return [{"id":r[0],"name":r[1],"currency":r[2]} for r in rows]
-
     def open_accounts_manager(self):
         win = tb.Toplevel(self); win.title("Cuentas"); win.transient(self); win.grab_set()
         frm = ttk.Frame(win, padding=12); frm.pack(fill=tk.BOTH, expand=True)
@@ -226,12 +519,15 @@ class MPApp(tb.Window):
         lst = tk.Listbox(frm, height=14, activestyle="dotbox")
         lst.grid(row=0, column=0, rowspan=6, sticky="nswe"); frm.columnconfigure(0, weight=1)
 
-        def reload_list():
-            accs = self.get_accounts()
+        def fill_list(accs):
+            if not lst.winfo_exists(): return
             lst.delete(0, tk.END)
             for a in accs:
                 lst.insert(tk.END, f"{a['name']} ({a['currency']})")
 
+        def reload_list():
+            self.tasks.submit("accounts-list", listar_cuentas, self.db_path, on_done=fill_list)
+
         def new_account():
             win2 = tb.Toplevel(win); win2.title("Nueva cuenta"); win2.transient(win); win2.grab_set()
             fr2 = ttk.Frame(win2, padding=12); fr2.pack(fill=tk.BOTH, expand=True)
@@ -256,13 +552,11 @@ class MPApp(tb.Window):
                 nombre = (name_var.get() or "").strip()
                 if not nombre:
                     messagebox.showwarning("Nueva cuenta","Ingresá un nombre.", parent=win2); return
-                with connect(self.db_path) as con:
-                    inst_id = self._ensure_generic_institution(con)
-                    con.execute(
-                        "INSERT INTO account(institution_id, name, type, currency, metadata) VALUES (?,?,?,?,?)",
-                        (inst_id, nombre, type_var.get(), curr_var.get(), json.dumps({"position": 10**9}))
-                    )
-                win2.destroy(); reload_list(); self.refresh_all()
+                def listo(_):
+                    if win2.winfo_exists(): win2.destroy()
+                    reload_list(); self.refresh_all()
+                self.escribir(crear_cuenta, nombre, type_var.get(), curr_var.get(),
+                              on_done=listo, parent=win2)
 
             ttk.Button(bar, text="Crear", bootstyle=SUCCESS, command=crear).pack(side=tk.RIGHT)
 
@@ -270,13 +564,10 @@ class MPApp(tb.Window):
             sel = lst.curselection()
             if not sel: return
             name = lst.get(sel[0]).rsplit(" (",1)[0]
-            with connect(self.db_path) as con:
-                row = con.execute("SELECT id FROM account WHERE name=?", (name,)).fetchone()
-                if not row: return
-                if not messagebox.askyesno("Eliminar", f"¿Eliminar cuenta «{name}»?", parent=win):
-                    return
-                con.execute("DELETE FROM account WHERE id=?", (row[0],))
-            reload_list(); self.refresh_all()
+            if not messagebox.askyesno("Eliminar", f"¿Eliminar cuenta «{name}»?", parent=win):
+                return
+            self.escribir(borrar_cuenta, name, parent=win,
+                          on_done=lambda _: (reload_list(), self.refresh_all()))
 
         btns = ttk.Frame(frm); btns.grid(row=0, column=1, sticky="n", padx=8)
         ttk.Button(btns, text="Nueva…",     bootstyle=SUCCESS,   command=new_account).pack(fill=tk.X, pady=2)
@@ -293,28 +584,26 @@ class MPApp(tb.Window):
         lst = tk.Listbox(frm, height=14, activestyle="dotbox")
         lst.grid(row=0, column=0, rowspan=6, sticky="nswe"); frm.columnconfigure(0, weight=1)
 
-        def reload_list():
-            with connect(self.db_path) as con:
-                rows = con.execute("SELECT name FROM category ORDER BY name").fetchall()
+        def fill_list(rows):
+            if not lst.winfo_exists(): return
             lst.delete(0, tk.END)
             for (name,) in rows:
                 lst.insert(tk.END, name)
 
+        def reload_list():
+            self.tasks.submit("categories-list", listar_categorias, self.db_path, on_done=fill_list)
+
         def add_cat():
             name = simpledialog.askstring("Nueva categoría", "Nombre:", parent=win)
             if not name: return
-            with connect(self.db_path) as con:
-                con.execute("INSERT OR IGNORE INTO category(name) VALUES (?)", (name.strip(),))
-            reload_list()
+            self.escribir(crear_categoria, name.strip(), parent=win, on_done=lambda _: reload_list())
 
         def del_cat():
             sel = lst.curselection()
             if not sel: return
             name = lst.get(sel[0])
             if not messagebox.askyesno("Eliminar", f"¿Eliminar «{name}»?", parent=win): return
-            with connect(self.db_path) as con:
-                con.execute("DELETE FROM category WHERE name=?", (name,))
-            reload_list()
+            self.escribir(borrar_categoria, name, parent=win, on_done=lambda _: reload_list())
 
         btns = ttk.Frame(frm); btns.grid(row=0, column=1, sticky="n", padx=8)
         ttk.Button(btns, text="Añadir…",    bootstyle=SUCCESS,   command=add_cat).pack(fill=tk.X, pady=2)
@@ -328,69 +617,79 @@ class MPApp(tb.Window):
         win = tb.Toplevel(self); win.title("Añadir movimiento"); win.transient(self); win.grab_set()
         frm = ttk.Frame(win, padding=12); frm.pack(fill=tk.BOTH, expand=True)
 
-        accounts = self.get_accounts()
-        if not accounts:
-            ttk.Label(frm, text="No hay cuentas en este ámbito.\nCreá una desde «Cuentas…».",
-                      foreground="#ff8080").grid(row=0, column=0, columnspan=2, sticky="w")
-            ttk.Button(frm, text="Cerrar", command=win.destroy).grid(row=1, column=1, sticky="e", padx=6, pady=8)
-            return
-
-        acc_labels = [f"{a['name']} ({a['currency']})" for a in accounts]
-        acc_var   = tk.StringVar(value=acc_labels[0])
-        date_var  = tk.StringVar(value=date.today().isoformat())
-        desc_var  = tk.StringVar(value="")
-        monto_var = tk.StringVar(value="")
-        tipo_var  = tk.IntVar(value=1)  # 1 ingreso / -1 egreso
-
-        ttk.Label(frm, text="Cuenta").grid(row=0, column=0, sticky="w")
-        ttk.Combobox(frm, values=acc_labels, state="readonly", width=40, textvariable=acc_var)\
-            .grid(row=0, column=1, sticky="ew", padx=6, pady=4)
-
-        ttk.Label(frm, text="Fecha (YYYY-MM-DD)").grid(row=1, column=0, sticky="w")
-        ttk.Entry(frm, width=16, textvariable=date_var).grid(row=1, column=1, sticky="w", padx=6, pady=4)
-
-        ttk.Label(frm, text="Descripción").grid(row=2, column=0, sticky="w")
-        ttk.Entry(frm, width=42, textvariable=desc_var).grid(row=2, column=1, sticky="ew", padx=6, pady=4)
+        cargando = ttk.Label(frm, text="Cargando cuentas…")
+        cargando.grid(row=0, column=0, columnspan=2, sticky="w")
+        win.bind("<Escape>", lambda e: win.destroy())
 
-        ttk.Label(frm, text="Tipo").grid(row=3, column=0, sticky="w")
-        box = ttk.Frame(frm); box.grid(row=3, column=1, sticky="w", padx=6, pady=4)
-        ttk.Radiobutton(box, text="Ingreso (+)", variable=tipo_var, value=1).pack(side=tk.LEFT, padx=(0,10))
-        ttk.Radiobutton(box, text="Egreso (–)",  variable=tipo_var, value=-1).pack(side=tk.LEFT)
+        def construir(accounts):
+            if not win.winfo_exists(): return
+            cargando.destroy()
+            if not accounts:
+                ttk.Label(frm, text="No hay cuentas en este ámbito.\nCreá una desde «Cuentas…».",
+                          foreground="#ff8080").grid(row=0, column=0, columnspan=2, sticky="w")
+                ttk.Button(frm, text="Cerrar", command=win.destroy).grid(row=1, column=1, sticky="e", padx=6, pady=8)
+                return
+
+            acc_labels = [f"{a['name']} ({a['currency']})" for a in accounts]
+            acc_var   = tk.StringVar(value=acc_labels[0])
+            date_var  = tk.StringVar(value=date.today().isoformat())
+            desc_var  = tk.StringVar(value="")
+            monto_var = tk.StringVar(value="")
+            tipo_var  = tk.IntVar(value=1)  # 1 ingreso / -1 egreso
+
+            ttk.Label(frm, text="Cuenta").grid(row=0, column=0, sticky="w")
+            ttk.Combobox(frm, values=acc_labels, state="readonly", width=40, textvariable=acc_var)\
+                .grid(row=0, column=1, sticky="ew", padx=6, pady=4)
+
+            ttk.Label(frm, text="Fecha (YYYY-MM-DD)").grid(row=1, column=0, sticky="w")
+            ttk.Entry(frm, width=16, textvariable=date_var).grid(row=1, column=1, sticky="w", padx=6, pady=4)
+
+            ttk.Label(frm, text="Descripción").grid(row=2, column=0, sticky="w")
+            ttk.Entry(frm, width=42, textvariable=desc_var).grid(row=2, column=1, sticky="ew", padx=6, pady=4)
+
+            ttk.Label(frm, text="Tipo").grid(row=3, column=0, sticky="w")
+            box = ttk.Frame(frm); box.grid(row=3, column=1, sticky="w", padx=6, pady=4)
+            ttk.Radiobutton(box, text="Ingreso (+)", variable=tipo_var, value=1).pack(side=tk.LEFT, padx=(0,10))
+            ttk.Radiobutton(box, text="Egreso (–)",  variable=tipo_var, value=-1).pack(side=tk.LEFT)
+
+            ttk.Label(frm, text="Monto").grid(row=4, column=0, sticky="w")
+            ent_monto = ttk.Entry(frm, width=20, textvariable=monto_var)
+            ent_monto.grid(row=4, column=1, sticky="w", padx=6, pady=4)
+
+            bar = ttk.Frame(frm); bar.grid(row=5, column=0, columnspan=2, sticky="e", pady=(10,0))
+            ttk.Button(bar, text="Cancelar", bootstyle=SECONDARY, command=win.destroy).pack(side=tk.RIGHT, padx=6)
+
+            def _validar_fecha(s: str) -> str:
+                s = (s or "").strip()
+                return datetime.strptime(s, "%Y-%m-%d").date().isoformat()
+
+            def guardar():
+                try:
+                    idx = acc_labels.index(acc_var.get()) if acc_var.get() in acc_labels else 0
+                    acc_id = accounts[idx]["id"]
+                    posted = _validar_fecha(date_var.get())
+                    desc   = (desc_var.get() or "").strip()
+                    amt_raw = parse_amount(monto_var.get())
+                    amt = abs(amt_raw) * (1 if tipo_var.get() >= 0 else -1)
+                except Exception as e:
+                    messagebox.showerror("Error", str(e), parent=win)
+                    return
+                def listo(_):
+                    if win.winfo_exists(): win.destroy()
+                    self.refresh_all()
+                self.escribir(guardar_movimiento, acc_id, posted, desc, amt, on_done=listo, parent=win)
 
-        ttk.Label(frm, text="Monto").grid(row=4, column=0, sticky="w")
-        ent_monto = ttk.Entry(frm, width=20, textvariable=monto_var)
-        ent_monto.grid(row=4, column=1, sticky="w", padx=6, pady=4)
+            ttk.Button(bar, text="Guardar", bootstyle=SUCCESS, command=guardar).pack(side=tk.RIGHT)
+            frm.columnconfigure(1, weight=1)
+            ent_monto.bind("<Return>", lambda e: guardar())
 
-        bar = ttk.Frame(frm); bar.grid(row=5, column=0, columnspan=2, sticky="e", pady=(10,0))
-        ttk.Button(bar, text="Cancelar", bootstyle=SECONDARY, command=win.destroy).pack(side=tk.RIGHT, padx=6)
+        def fallo(exc: BaseException):
+            if not win.winfo_exists(): return
+            messagebox.showerror("Añadir movimiento", str(exc), parent=win)
+            win.destroy()
 
-        def _validar_fecha(s: str) -> str:
-            s = (s or "").strip()
-            return datetime.strptime(s, "%Y-%m-%d").date().isoformat()
-
-        def guardar():
-            try:
-                idx = acc_labels.index(acc_var.get()) if acc_var.get() in acc_labels else 0
-                acc_id = accounts[idx]["id"]
-                posted = _validar_fecha(date_var.get())
-                desc   = (desc_var.get() or "").strip()
-                amt_raw = parse_amount(monto_var.get())
-                amt = abs(amt_raw) * (1 if tipo_var.get() >= 0 else -1)
-                with connect(self.db_path) as con:
-                    row = con.execute("SELECT currency FROM account WHERE id=?", (acc_id,)).fetchone()
-                    if not row: raise RuntimeError("Cuenta no encontrada.")
-                    con.execute(
-                        "INSERT INTO transactions(account_id, posted_at, description, amount, currency) VALUES (?,?,?,?,?)",
-                        (acc_id, posted, desc, amt, row[0])
-                    )
-                win.destroy(); self.refresh_all()
-            except Exception as e:
-                messagebox.showerror("Error", str(e), parent=win)
-
-        ttk.Button(bar, text="Guardar", bootstyle=SUCCESS, command=guardar).pack(side=tk.RIGHT)
-        frm.columnconfigure(1, weight=1)
-        win.bind("<Escape>", lambda e: win.destroy())
-        ent_monto.bind("<Return>", lambda e: guardar())
+        self.tasks.submit("add-accounts", listar_cuentas, self.db_path,
+                          on_done=construir, on_error=fallo)
 
     # --- Importar / Exportar (placeholders simples para no romper) ---
     def on_import(self):
@@ -421,49 +720,89 @@ class MPApp(tb.Window):
             parent=self
         ):
             return
-        from finanzasportable.services.db import connect
-        try:
-            with connect(self.db_path) as con:
-                con.executemany("DELETE FROM transactions WHERE id=?", [(i,) for i in ids])
-        except Exception as e:
-            messagebox.showerror("Eliminar", f"No se pudo eliminar: {e}", parent=self)
-            return
-        self.refresh_all()
+        self.escribir(borrar_movimientos, ids, titulo="Eliminar",
+                      on_done=lambda _: self.refresh_all())
     
 
     # --- Carga de datos ---
-    def load_balances(self):
-        for w in list(self.left_list.winfo_children()):
-            w.destroy()
-
-        rows = listar_saldos_por_cuenta(self.db_path)
-        total = total_saldo(self.db_path)
-
-        grp = ttk.Frame(self.left_list); grp.pack(anchor="center")
-        for (_id, name, curr, bal, _meta) in rows:
-            card = ttk.Frame(grp, padding=6, bootstyle=SECONDARY); card.pack(fill=tk.X, pady=4)
-            ttk.Label(card, text=name,  font=("Helvetica", 12, "bold"), anchor="center").pack(fill="x")
-            ttk.Label(card, text=curr,  anchor="center").pack(fill="x")
-            ttk.Label(card, text=money(bal, curr), font=("Helvetica", 12, "bold"), anchor="center").pack(fill="x")
-
-        self.total_var.set(money(total))
-
-    def load_activity(self):
-        for i in self.tv.get_children(): self.tv.delete(i)
-        rows = listar_transacciones(self.db_path)
-        for tx_id, posted_at, desc, amount, acc_name in rows:
-            tag  = "ingreso" if amount > 0 else "egreso" if amount < 0 else "neutro"
-            tipo = "Ingreso" if amount > 0 else "Egreso" if amount < 0 else "—"
-            self.tv.insert("", "end", iid=str(tx_id),
-                           values=(posted_at, desc or "", tipo, money(amount), acc_name),
-                           tags=(tag,))
+    def load_balances(self, rows, total):
+        """
+        Actualiza las tarjetas de saldo por id de cuenta con lo que trajo
+        cargar_tablero: crea las nuevas, destruye las que ya no están y solo
+        reconfigura los textos que cambiaron.
+        """
+        if self._cards_box is None:
+            self._cards_box = ttk.Frame(self.left_list); self._cards_box.pack(anchor="center")
+        cards = self._cards
+
+        wanted = [r[0] for r in rows]
+        wanted_set = set(wanted)
+        for acc_id in [i for i in cards if i not in wanted_set]:
+            cards.pop(acc_id)["frame"].destroy()
+
+        old_order = [i for i in self._card_order if i in cards]
+        for index, (acc_id, name, curr, bal, _meta) in enumerate(rows):
+            texts = (name, curr, money(bal, curr))
+            card = cards.get(acc_id)
+            if card is None:
+                frame = ttk.Frame(self._cards_box, padding=6, bootstyle=SECONDARY)
+                labels = (
+                    ttk.Label(frame, text=texts[0], font=("Helvetica", 12, "bold"), anchor="center"),
+                    ttk.Label(frame, text=texts[1], anchor="center"),
+                    ttk.Label(frame, text=texts[2], font=("Helvetica", 12, "bold"), anchor="center"),
+                )
+                for lbl in labels:
+                    lbl.pack(fill="x")
+                # Se ubica antes de la siguiente tarjeta ya existente (si hay)
+                after = next((cards[i]["frame"] for i in wanted[index + 1:] if i in cards), None)
+                frame.pack(fill=tk.X, pady=4, **({"before": after} if after else {}))
+                cards[acc_id] = {"frame": frame, "labels": labels, "texts": texts}
+                continue
+            for lbl, old, new in zip(card["labels"], card["texts"], texts):
+                if old != new:
+                    lbl.configure(text=new)
+            card["texts"] = texts
+
+        # Si cambió el orden de las que ya estaban (p. ej. un renombre), se reacomodan
+        if [i for i in wanted if i in old_order] != old_order:
+            for acc_id in wanted:
+                cards[acc_id]["frame"].pack_forget()
+            for acc_id in wanted:
+                cards[acc_id]["frame"].pack(fill=tk.X, pady=4)
+        self._card_order = wanted
+
+        total_text = money(total)
+        if self.total_var.get() != total_text:
+            self.total_var.set(total_text)
 
     def refresh_all(self):
-        self.prepare_db()
-        self.load_balances()
-        self.load_activity()
+        """Recarga saldos y actividad en segundo plano; al volver solo se actualizan widgets."""
+        self.db_path = self.current_path()
+        self.tasks.submit("refresh", cargar_tablero, self.db_path, VirtualActivity.PAGE_SIZE,
+                          on_done=self._apply_dashboard, on_error=self._on_load_error)
+
+    def _apply_dashboard(self, data: dict):
+        if data["path"] != self.db_path:
+            return
+        self.load_balances(data["balances"], data["total"])
+        self.activity.load(data["path"], data["activity_total"], data["first_page"])
+        if profiling.ACTIVO:
+            self.after_idle(lambda: (profiling.marca("tablero con datos"), profiling.reporte()))
 
 # --- Main ---
+def main(master: tk.Misc | None = None, usuario=None) -> MPApp:
+    """Abre MPApp sobre 'master' o, si no hay, sobre una raíz oculta propia."""
+    if master is None:
+        master = tb.Window(themename=MPApp.THEME)
+        master.withdraw()
+    app = MPApp(master, usuario)
+    if profiling.ACTIVO:
+        profiling.marca("MPApp construida")
+        def primer_dibujo(_event=None):
+            app.unbind("<Map>")
+            app.after_idle(profiling.marca, "primer dibujo")
+        app.bind("<Map>", primer_dibujo)
+    return app
+
 if __name__ == "__main__":
-    app = MPApp()
-    app.mainloop()
+    main().master.mainloop()
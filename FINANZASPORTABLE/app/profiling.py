@@ -0,0 +1,42 @@
+"""
+Medición del arranque de la GUI: `python -m app.gui_mp --profile-startup`.
+
+Toma marcas de tiempo (y cuántos módulos había cargados) en cada etapa:
+imports de app.gui_mp, creación de MPApp, primer dibujo y tablero con
+datos, y al final imprime el desglose por stderr. Sin la opción, marca()
+no hace nada. Para el detalle módulo por módulo:
+`python -X importtime -m app.gui_mp`.
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+ACTIVO = "--profile-startup" in sys.argv
+if ACTIVO:
+    sys.argv.remove("--profile-startup")
+
+_T0 = time.perf_counter()
+_marcas: list[tuple[str, float, int]] = [("inicio", _T0, len(sys.modules))]
+_reportado = False
+
+
+def marca(etiqueta: str) -> None:
+    if ACTIVO:
+        _marcas.append((etiqueta, time.perf_counter(), len(sys.modules)))
+
+
+def reporte(file=None) -> None:
+    """Imprime el desglose una sola vez (la primera vez que se llama)."""
+    global _reportado
+    if not ACTIVO or _reportado:
+        return
+    _reportado = True
+    file = file or sys.stderr
+    print("\n== Arranque de app.gui_mp ==", file=file)
+    print(f"{'etapa':<28}{'ms':>9}{'acum. ms':>11}{'módulos':>9}", file=file)
+    for (_, t_prev, m_prev), (etiqueta, t, m) in zip(_marcas, _marcas[1:]):
+        print(f"{etiqueta:<28}{(t - t_prev) * 1000:>9.1f}{(t - _T0) * 1000:>11.1f}{m - m_prev:>+9d}",
+              file=file)
+    pesados = [m for m in ("pandas", "numpy", "openpyxl") if m in sys.modules]
+    print(f"módulos pesados cargados: {', '.join(pesados) or 'ninguno'}", file=file)
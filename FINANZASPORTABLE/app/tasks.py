@@ -0,0 +1,106 @@
+"""
+Ejecutor de tareas en segundo plano para la GUI.
+
+Las llamadas a servicios corren en un pool de hilos y sus resultados vuelven
+al hilo de Tk con un sondeo vía after(): solo el hilo principal toca widgets.
+Cada tarea se identifica con una clave; pedir de nuevo la misma clave cancela
+(o descarta al llegar) el resultado de la anterior.
+"""
+from __future__ import annotations
+
+import queue
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class TaskRunner:
+    POLL_MS = 30
+
+    def __init__(self, widget, max_workers: int = 2,
+                 on_busy: Callable[[bool], None] | None = None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="finanzas-task")
+        self._done: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._current: dict[str, tuple[int, Future]] = {}
+        self._seq = 0
+        self._polling = False
+        self._busy = False
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._current)
+
+    def submit(self, key: str, fn: Callable, *args,
+               on_done: Callable | None = None,
+               on_error: Callable[[BaseException], None] | None = None, **kwargs) -> int:
+        """
+        Ejecuta fn(*args, **kwargs) en un hilo. on_done(resultado) u
+        on_error(excepción) se llaman en el hilo de Tk, solo si la tarea
+        sigue siendo la última pedida para 'key'.
+        """
+        previous = self._current.pop(key, None)
+        if previous is not None:
+            previous[1].cancel()
+        self._seq += 1
+        token = self._seq
+        future = self._pool.submit(fn, *args, **kwargs)
+        self._current[key] = (token, future)
+        future.add_done_callback(
+            lambda f: self._done.put((key, token, f, on_done, on_error))
+        )
+        self._notify_busy()
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_MS, self._poll)
+        return token
+
+    def cancel(self, key: str) -> None:
+        """Descarta la tarea pendiente de 'key' (si todavía no empezó, no corre)."""
+        current = self._current.pop(key, None)
+        if current is not None:
+            current[1].cancel()
+            self._notify_busy()
+
+    def shutdown(self) -> None:
+        self._current.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- hilo de Tk ---
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    key, token, future, on_done, on_error = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                current = self._current.get(key)
+                if current is None or current[0] != token or future.cancelled():
+                    continue  # obsoleta: hubo un pedido más nuevo con la misma clave
+                del self._current[key]
+                exc = future.exception()
+                try:
+                    if exc is not None:
+                        (on_error or self._report)(exc)
+                    elif on_done is not None:
+                        on_done(future.result())
+                except Exception as cb_exc:
+                    self._report(cb_exc)
+        finally:
+            self._notify_busy()
+            if self._current:
+                self.widget.after(self.POLL_MS, self._poll)
+            else:
+                self._polling = False
+
+    def _notify_busy(self):
+        busy = self.busy
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy is not None:
+                self.on_busy(busy)
+
+    @staticmethod
+    def _report(exc: BaseException):
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
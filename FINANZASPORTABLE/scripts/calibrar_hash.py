@@ -0,0 +1,18 @@
+# Hace que el paquete "finanzasportable" se pueda importar desde ./src
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC  = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from finanzasportable.auth import hashing
+
+# Mide esta máquina y guarda el costo del hash de contraseñas (solo si sube).
+# Los usuarios con un costo menor se re-hashean en su próximo login.
+objetivo = float(sys.argv[1]) if len(sys.argv) > 1 else 0.25
+anterior = hashing.COSTO[hashing.ALGORITMO]
+costo = hashing.calibrar(objetivo, aplicar=True)
+if hashing.COSTO[hashing.ALGORITMO] != anterior:
+    print(f"✅ {hashing.ALGORITMO}: costo {anterior} → {costo} (guardado en {hashing.COSTO_FILE}).")
+else:
+    print(f"✔ {hashing.ALGORITMO}: medido {costo}, se mantiene {anterior}.")
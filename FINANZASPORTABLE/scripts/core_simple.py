@@ -1,11 +1,11 @@
 from pathlib import Path
 import sys
-from finanzasportable.services.db import connect, db_path_general
+from finanzasportable.services.db import connect, db_path_general, ensure_schema
 try:
     # si existe, la usamos para clonar a cada base
-    from finanzasportable.services.core_sync import ensure_core_cloned
+    from finanzasportable.services.core_sync import sync_all as sync_core_all
 except Exception:
-    ensure_core_cloned = None
+    sync_core_all = None
 
 ROOT  = Path(__file__).resolve().parents[1]
 DBDIR = ROOT / "data"
@@ -51,17 +51,17 @@ def delete_category(name):
     print(f"✔ Categoría eliminada: '{name}' en GENERAL.")
 
 def sync_all():
-    if ensure_core_cloned is None:
-        print("ⓘ No encontré ensure_core_cloned; abrí la app y cambiá de mes para que sincronice.")
+    if sync_core_all is None:
+        print("ⓘ No encontré core_sync.sync_all; abrí la app y cambiá de mes para que sincronice.")
         return
-    g = db_path_general()
-    count = 0
-    for p in sorted(DBDIR.glob("*.db")):
-        if p.name.lower() == Path(g).name.lower():
-            continue
-        ensure_core_cloned(p)
-        count += 1
-    print(f"✔ Core sincronizado a {count} bases (mes/año).")
+    results = sync_core_all(DBDIR, db_path_general())
+    for r in results:
+        if r.error:
+            print(f"✖ {r.path.name}: {r.error}")
+    synced = sum(1 for r in results if not r.error and not r.skipped)
+    skipped = sum(1 for r in results if r.skipped)
+    seconds = sum(r.seconds for r in results)
+    print(f"✔ Core sincronizado a {synced} bases (mes/año), {skipped} ya al día ({seconds:.2f} s).")
 
 def list_all(where="general"):
     if where == "general":
@@ -108,6 +108,8 @@ def main():
     if len(sys.argv) < 2:
         print(USAGE); return
     cmd = sys.argv[1]
+    # Con el esquema al día, los triggers anotan cada cambio para 'sync'
+    ensure_schema(db_path_general())
 
     if cmd == "add-account":
         name = sys.argv[2]
@@ -0,0 +1,33 @@
+# Hace que el paquete "finanzasportable" se pueda importar desde ./src
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC  = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from finanzasportable.services.db import db_path_general
+from finanzasportable.services.importer import import_file
+
+USAGE = """
+Uso:
+  python scripts/import_table.py ARCHIVO.csv|xlsx [BASE.db] [CUENTA_POR_DEFECTO]
+Las columnas se asignan por nombre (fecha, cuenta, descripción, monto, moneda).
+El archivo se lee e inserta por bloques, sin cargarlo entero en memoria.
+"""
+
+def main():
+    if len(sys.argv) < 2:
+        print(USAGE); return 2
+    path = pathlib.Path(sys.argv[1])
+    db = pathlib.Path(sys.argv[2]) if len(sys.argv) > 2 else ROOT / db_path_general()
+    defaults = {"account": sys.argv[3] if len(sys.argv) > 3 else "General", "currency": "ARS"}
+
+    def progress(report, fraction):
+        print(f"\r… {fraction:6.1%}  {report.inserted} filas", end="", flush=True)
+
+    report = import_file(db, path, defaults=defaults, on_progress=progress)
+    print(f"\r✅ {path.name} → {db.name}: {report}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,17 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
 from pathlib import Path
-from finanzasportable.services.db import connect, db_path_general
-from finanzasportable.services.core_sync import ensure_core_cloned
+from finanzasportable.services.db import connect, db_path_general, ensure_schema
+from finanzasportable.services.core_sync import sync_all as sync_core_all
 
 DBDIR = (Path(__file__).resolve().parents[1] / "data")
 
 class CoreManager(tk.Tk):
     def __init__(self):
         super().__init__()
+        # Con el esquema al día, los triggers anotan cada cambio para sincronizar
+        ensure_schema(db_path_general())
         self.title("Gestor de Cuentas y Categorías (GENERAL)")
         self.geometry("600x420")
 
@@ -103,15 +106,32 @@ class CoreManager(tk.Tk):
             con.execute("DELETE FROM category WHERE name=?", (name,))
         self.refresh(); messagebox.showinfo("OK", f"Categoría '{name}' eliminada.", parent=self)
 
-    # ---- sincronizar core GENERAL → todos los .db
+    # ---- sincronizar core GENERAL → todos los .db (en un hilo: no congela la ventana)
     def sync_all(self):
-        count = 0
-        for p in sorted(DBDIR.glob("*.db")):
-            if p.name == "general.db":
-                continue
-            ensure_core_cloned(p)  # recibe Path
-            count += 1
-        messagebox.showinfo("Sincronizado", f"Core replicado a {count} bases (mes/año).", parent=self)
+        done = []
+        worker = threading.Thread(target=lambda: done.append(sync_core_all(DBDIR, db_path_general())),
+                                  daemon=True)
+        worker.start()
+        self.config(cursor="watch")
+        self.after(50, self._sync_wait, worker, done)
+
+    def _sync_wait(self, worker, done):
+        if worker.is_alive():
+            self.after(50, self._sync_wait, worker, done)
+            return
+        self.config(cursor="")
+        if not done:
+            messagebox.showerror("Error", "La sincronización falló.", parent=self)
+            return
+        results = done[0]
+        errors = [f"{r.path.name}: {r.error}" for r in results if r.error]
+        synced = sum(1 for r in results if not r.error and not r.skipped)
+        skipped = sum(1 for r in results if r.skipped)
+        msg = f"Core replicado a {synced} bases (mes/año), {skipped} ya al día."
+        if errors:
+            messagebox.showwarning("Sincronizado con errores", msg + "\n\n" + "\n".join(errors), parent=self)
+        else:
+            messagebox.showinfo("Sincronizado", msg, parent=self)
         self.refresh()
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+# Hace que el paquete "finanzasportable" se pueda importar desde ./src
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC  = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from finanzasportable.services.db import upgrade_all, SCHEMA_VERSION
+
+# Migra en el lugar general.db, YYYY.db y YYYY-MM.db a la última versión de esquema
+data_dir = pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else ROOT / "data"
+versions = upgrade_all(data_dir)
+for p, v in versions.items():
+    print(f" - {p.name}: v{v}")
+print(f"✅ {len(versions)} bases en versión {SCHEMA_VERSION}.")
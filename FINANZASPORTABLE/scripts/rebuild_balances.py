@@ -0,0 +1,37 @@
+# Hace que el paquete "finanzasportable" se pueda importar desde ./src
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC  = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from finanzasportable.services.db import iter_db_files
+from finanzasportable.services.balances import reconstruir_saldos, verificar_saldos
+from finanzasportable.utils.formats import format_cents
+
+USAGE = """
+Uso:
+  python scripts/rebuild_balances.py verify     # compara account_balance con los movimientos
+  python scripts/rebuild_balances.py rebuild    # recalcula account_balance desde cero
+"""
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd not in ("verify", "rebuild"):
+        print(USAGE); return 2
+    bad = 0
+    for p in iter_db_files(ROOT / "data"):
+        if cmd == "rebuild":
+            n = reconstruir_saldos(p)
+            print(f"✔ {p.name}: {n} cuentas recalculadas.")
+            continue
+        diffs = verificar_saldos(p)
+        bad += len(diffs)
+        for account_id, guardado, calculado in diffs:
+            print(f"❌ {p.name}: cuenta {account_id} guardado={format_cents(guardado)} calculado={format_cents(calculado)}")
+        if not diffs:
+            print(f"✔ {p.name}: saldos OK.")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
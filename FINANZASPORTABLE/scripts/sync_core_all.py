@@ -1,13 +1,11 @@
 from pathlib import Path
-from manage_core_gui import ensure_schema, ensure_core_cloned, db_path_general, DBDIR
+from manage_core_gui import ensure_schema, sync_core_all, db_path_general, DBDIR
 
-# Asegura GENERAL y copia core a todos los .db (menos GENERAL)
-g = ensure_schema(db_path_general())
-count = 0
-for p in sorted(DBDIR.glob("*.db")):
-    if p.name == "general.db": 
-        continue
-    ensure_schema(p)
-    ensure_core_cloned(p)
-    count += 1
-print(f"✅ Core de GENERAL replicado a {count} bases.")
+# Asegura GENERAL y copia core a todos los .db (menos GENERAL), en paralelo
+ensure_schema(db_path_general())
+results = sync_core_all(DBDIR, db_path_general())
+for r in results:
+    if r.error:
+        print(f"✖ {r.path.name}: {r.error}")
+count = sum(1 for r in results if not r.error)
+print(f"✅ Core de GENERAL replicado a {count} bases ({sum(r.skipped for r in results)} ya al día).")
@@ -5,6 +5,8 @@ Clases principales:
 - Usuario
 - Rol
 - TokenConfirmacion
+- RepositorioUsuarios (índice email → usuario)
+- AlmacenTokens (tokens de confirmación persistentes)
 
 Servicios principales:
 - registrar_usuario
@@ -13,4 +15,6 @@ Servicios principales:
 """
 
 from .models import Usuario, Rol, TokenConfirmacion, EstadoCuenta
+from .repository import RepositorioUsuarios
+from .tokens import AlmacenTokens
 from .service import registrar_usuario, confirmar_cuenta, login
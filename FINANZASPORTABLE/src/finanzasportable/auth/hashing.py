@@ -0,0 +1,132 @@
+"""
+Hash de contraseñas con sal y costo ajustable.
+
+Formato guardado: "scrypt$<n>$<sal b64>$<hash b64>" (r=8, p=1) o, si el
+Python no trae hashlib.scrypt, "pbkdf2_sha256$<iteraciones>$<sal>$<hash>".
+Los hashes viejos (SHA-256 hex sin sal) se siguen aceptando y
+necesita_rehash() los marca para reemplazarlos en el próximo login.
+
+El costo se calibra una vez por máquina (scripts/calibrar_hash.py) y queda
+guardado en COSTO_FILE; al importar este módulo se lee de ahí.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+ALGORITMO = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+# Costo actual por algoritmo: N de scrypt (potencia de 2) o iteraciones de PBKDF2
+COSTO = {"scrypt": 2 ** 14, "pbkdf2_sha256": 600_000}
+COSTO_MIN = {"scrypt": 2 ** 12, "pbkdf2_sha256": 100_000}
+COSTO_MAX = {"scrypt": 2 ** 17, "pbkdf2_sha256": 10_000_000}
+_SCRYPT_R, _SCRYPT_P = 8, 1
+COSTO_FILE = os.path.join(os.path.dirname(__file__), "hash_costo.json")
+
+# hashlib suelta el GIL mientras deriva la clave: con hilos alcanza para no
+# bloquear la ventana de Tk.
+_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="auth-kdf")
+
+def cargar_costo(path: Optional[str] = None) -> int:
+    """Aplica el costo guardado para ALGORITMO (acotado a los límites). Devuelve el vigente."""
+    try:
+        with open(path or COSTO_FILE, "r", encoding="utf-8") as f:
+            guardado = int(json.load(f)[ALGORITMO])
+    except (OSError, ValueError, KeyError, TypeError):
+        return COSTO[ALGORITMO]
+    COSTO[ALGORITMO] = min(COSTO_MAX[ALGORITMO], max(COSTO_MIN[ALGORITMO], guardado))
+    return COSTO[ALGORITMO]
+
+def guardar_costo(costo: int, path: Optional[str] = None) -> None:
+    """Guarda 'costo' como el de ALGORITMO en esta máquina (y lo aplica)."""
+    path = path or COSTO_FILE
+    data = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        pass
+    data[ALGORITMO] = int(costo)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    COSTO[ALGORITMO] = int(costo)
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+def _derivar(algoritmo: str, password: str, sal: bytes, costo: int) -> bytes:
+    clave = password.encode("utf-8")
+    if algoritmo == "scrypt":
+        return hashlib.scrypt(clave, salt=sal, n=costo, r=_SCRYPT_R, p=_SCRYPT_P,
+                              maxmem=256 * _SCRYPT_R * costo, dklen=32)
+    if algoritmo == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", clave, sal, costo, dklen=32)
+    raise ValueError(f"Algoritmo de hash desconocido: {algoritmo}")
+
+def hash_password(password: str, costo: Optional[int] = None) -> str:
+    costo = costo or COSTO[ALGORITMO]
+    sal = os.urandom(16)
+    return f"{ALGORITMO}${costo}${_b64(sal)}${_b64(_derivar(ALGORITMO, password, sal, costo))}"
+
+def _es_legado(guardado: str) -> bool:
+    return "$" not in guardado
+
+def verificar(password: str, guardado: str) -> bool:
+    """Compara en tiempo constante contra un hash nuevo o uno SHA-256 heredado."""
+    if _es_legado(guardado):
+        viejo = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(viejo, guardado)
+    try:
+        algoritmo, costo, sal, esperado = guardado.split("$")
+        esperado = base64.b64decode(esperado)
+        obtenido = _derivar(algoritmo, password, base64.b64decode(sal), int(costo))
+    except ValueError:  # incluye binascii.Error de un base64 roto
+        return False
+    return hmac.compare_digest(obtenido, esperado)
+
+def necesita_rehash(guardado: str) -> bool:
+    """
+    True si el hash es heredado, de otro algoritmo o de un costo menor al
+    actual. Un costo mayor se deja como está: bajar el costo no reescribe
+    hashes en cada login.
+    """
+    if _es_legado(guardado):
+        return True
+    try:
+        algoritmo, costo = guardado.split("$")[:2]
+        return algoritmo != ALGORITMO or int(costo) < COSTO[ALGORITMO]
+    except ValueError:
+        return False
+
+def calibrar(objetivo_s: float = 0.25, aplicar: bool = False) -> int:
+    """
+    Busca el costo con el que un hash tarda ~objetivo_s en esta máquina
+    (scrypt duplica N; PBKDF2 escala las iteraciones). Con aplicar=True se
+    guarda en COSTO_FILE, pero solo si supera al vigente: una medición lenta
+    o ruidosa no baja el costo.
+    """
+    costo, minimo, maximo = COSTO_MIN[ALGORITMO], COSTO_MIN[ALGORITMO], COSTO_MAX[ALGORITMO]
+    sal = os.urandom(16)
+    while True:
+        t0 = time.perf_counter()
+        _derivar(ALGORITMO, "calibracion", sal, costo)
+        dt = time.perf_counter() - t0
+        if ALGORITMO == "scrypt":
+            if dt * 2 > objetivo_s * 1.4 or costo * 2 > maximo:
+                break
+            costo *= 2
+        else:
+            costo = min(maximo, max(minimo, int(costo * objetivo_s / max(dt, 1e-6))))
+            break
+    if aplicar and costo > COSTO[ALGORITMO]:
+        guardar_costo(costo)
+    return costo
+
+cargar_costo()
+
+def en_segundo_plano(fn: Callable, *args, **kwargs) -> Future:
+    """Corre fn (que hashea o verifica) en el pool del KDF."""
+    return _POOL.submit(fn, *args, **kwargs)
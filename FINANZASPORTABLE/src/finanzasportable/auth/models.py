@@ -3,7 +3,7 @@ from enum import Enum
 from datetime import datetime, timedelta
 from typing import List
 import uuid
-import hashlib
+from . import hashing
 
 
 class EstadoCuenta(str, Enum):
@@ -29,11 +29,14 @@ class Usuario:
 
   @staticmethod
   def hash_password(password: str) -> str:
-    # Hash simple para el TP (no usar en producción real)
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    # scrypt (o PBKDF2) con sal y costo ajustable: ver auth.hashing
+    return hashing.hash_password(password)
 
   def verificar_password(self, password: str) -> bool:
-    return self.password_hash == self.hash_password(password)
+    return hashing.verificar(password, self.password_hash)
+
+  def necesita_rehash(self) -> bool:
+    return hashing.necesita_rehash(self.password_hash)
 
   def tiene_permiso(self, permiso: str) -> bool:
     return any(permiso in r.permisos for r in self.roles)
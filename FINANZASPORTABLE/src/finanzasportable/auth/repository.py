@@ -0,0 +1,84 @@
+import re
+from typing import Dict, Iterator, List, Optional
+from .models import Usuario
+
+_ID_RE = re.compile(r"user-(\d+)")
+
+def normalizar_email(email: str) -> str:
+    """Clave del índice: sin espacios alrededor y sin distinguir mayúsculas."""
+    return email.strip().casefold()
+
+class RepositorioUsuarios:
+    """
+    Usuarios por id con un índice email → id, así login y registro buscan en
+    O(1). Los ids nuevos salen de un contador que nunca baja (el mayor
+    'user-N' visto + 1): borrar un usuario no hace que otro herede su id.
+    Los archivos viejos pueden tener el mismo email con otras mayúsculas en
+    dos usuarios (antes se comparaba exacto): al cargarlos se aceptan y la
+    clave apunta a todos; solo un alta nueva se rechaza.
+    """
+
+    def __init__(self, usuarios: Optional[Dict[str, Usuario]] = None):
+        self.usuarios: Dict[str, Usuario] = {}
+        self._por_email: Dict[str, List[str]] = {}
+        self._ultimo_id = 0
+        for usuario in (usuarios or {}).values():
+            self.incorporar(usuario)
+
+    def _indexar(self, usuario: Usuario, nuevo: bool) -> None:
+        clave = normalizar_email(usuario.email)
+        if nuevo and clave in self._por_email:
+            raise ValueError("El email ya está registrado")
+        self.usuarios[usuario.id] = usuario
+        ids = self._por_email.setdefault(clave, [])
+        if usuario.id not in ids:
+            ids.append(usuario.id)
+        m = _ID_RE.fullmatch(usuario.id)
+        if m:
+            self._ultimo_id = max(self._ultimo_id, int(m.group(1)))
+
+    def nuevo_id(self) -> str:
+        self._ultimo_id += 1
+        return f"user-{self._ultimo_id}"
+
+    def agregar(self, usuario: Usuario) -> Usuario:
+        """Alta de un usuario nuevo: falla si el email ya está registrado."""
+        self._indexar(usuario, nuevo=True)
+        return usuario
+
+    def incorporar(self, usuario: Usuario) -> Usuario:
+        """Suma un usuario ya guardado (cargado del archivo), aunque repita el email."""
+        self._indexar(usuario, nuevo=False)
+        return usuario
+
+    def quitar(self, user_id: str) -> Optional[Usuario]:
+        usuario = self.usuarios.pop(user_id, None)
+        if usuario is not None:
+            clave = normalizar_email(usuario.email)
+            ids = self._por_email.get(clave, [])
+            if user_id in ids:
+                ids.remove(user_id)
+            if not ids:
+                self._por_email.pop(clave, None)
+        return usuario
+
+    def por_id(self, user_id: str) -> Optional[Usuario]:
+        return self.usuarios.get(user_id)
+
+    def por_email(self, email: str) -> Optional[Usuario]:
+        """Con variantes repetidas gana la que coincide exacto; si no, la primera cargada."""
+        ids = self._por_email.get(normalizar_email(email))
+        if not ids:
+            return None
+        candidatos = [self.usuarios[i] for i in ids]
+        exacto = email.strip()
+        return next((u for u in candidatos if u.email.strip() == exacto), candidatos[0])
+
+    def existe_email(self, email: str) -> bool:
+        return normalizar_email(email) in self._por_email
+
+    def __len__(self) -> int:
+        return len(self.usuarios)
+
+    def __iter__(self) -> Iterator[Usuario]:
+        return iter(self.usuarios.values())
@@ -1,60 +1,50 @@
-import json
 import os
 from typing import Dict, Optional
-from .models import Usuario, Rol, TokenConfirmacion, EstadoCuenta
+from .models import Usuario, TokenConfirmacion, EstadoCuenta
+from .repository import RepositorioUsuarios
+from .storage import AlmacenUsuarios
+from .tokens import AlmacenTokens
 
 USERS_FILE = os.path.join(os.path.dirname(__file__), "users_db.json")
+TOKENS_FILE = os.path.join(os.path.dirname(__file__), "tokens.db")
+ALMACEN = AlmacenUsuarios(USERS_FILE)
 
 def cargar_usuarios() -> Dict[str, Usuario]:
-    if not os.path.exists(USERS_FILE):
-        return {}
-    with open(USERS_FILE, "r") as f:
-        data = json.load(f)
-    usuarios = {}
-    for user_id, u in data.items():
-        usuarios[user_id] = Usuario(
-            id=user_id,
-            nombre=u["nombre"],
-            email=u["email"],
-            password_hash=u["password_hash"],
-            estado=EstadoCuenta(u["estado"]),
-            roles=[Rol(nombre=r) for r in u.get("roles", [])]
-        )
-    return usuarios
+    return ALMACEN.cargar()
 
 def guardar_usuarios(usuarios: Dict[str, Usuario]):
-    data = {}
-    for user_id, u in usuarios.items():
-        data[user_id] = {
-            "nombre": u.nombre,
-            "email": u.email,
-            "password_hash": u.password_hash,
-            "estado": u.estado.value,
-            "roles": [r.nombre for r in u.roles]
-        }
-    with open(USERS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-USUARIOS = cargar_usuarios()
-TOKENS: Dict[str, TokenConfirmacion] = {}
+    """Reescribe el archivo completo (atómico) y vacía el log de cambios."""
+    ALMACEN.compactar(usuarios)
+
+REPOSITORIO = RepositorioUsuarios(cargar_usuarios())
+USUARIOS = REPOSITORIO.usuarios  # id -> Usuario (el índice por email vive en REPOSITORIO)
+TOKENS = AlmacenTokens(TOKENS_FILE)
+
+def _usuario_por_id(user_id: str) -> Optional[Usuario]:
+    """Si no está en memoria, puede haberlo registrado otro proceso: se relee el archivo."""
+    usuario = REPOSITORIO.por_id(user_id)
+    if usuario is None:
+        usuario = cargar_usuarios().get(user_id)
+        if usuario is not None:
+            REPOSITORIO.incorporar(usuario)
+    return usuario
 
 def registrar_usuario(nombre: str, email: str, password: str) -> TokenConfirmacion:
-    if any(u.email == email for u in USUARIOS.values()):
+    if REPOSITORIO.existe_email(email):
         raise ValueError("El email ya está registrado")
 
-    user_id = f"user-{len(USUARIOS) + 1}"
-    usuario = Usuario(
+    user_id = REPOSITORIO.nuevo_id()
+    usuario = REPOSITORIO.agregar(Usuario(
         id=user_id,
         nombre=nombre,
-        email=email,
+        email=email.strip(),
         password_hash=Usuario.hash_password(password),
         estado=EstadoCuenta.PENDIENTE,
-    )
-    USUARIOS[user_id] = usuario
-    guardar_usuarios(USUARIOS)
+    ))
+    ALMACEN.guardar(usuario, USUARIOS)
 
     token = TokenConfirmacion.generar(usuario_id=user_id)
-    TOKENS[token.token] = token
+    TOKENS.guardar(token)
     return token
 
 def confirmar_cuenta(token_str: str) -> Usuario:
@@ -65,17 +55,17 @@ def confirmar_cuenta(token_str: str) -> Usuario:
     if not token.es_valido():
         raise ValueError("Token expirado o ya utilizado")
 
-    usuario = USUARIOS[token.usuario_id]
+    usuario = _usuario_por_id(token.usuario_id)
+    if usuario is None:
+        raise ValueError("Token inválido")
     usuario.estado = EstadoCuenta.ACTIVA
     token.usado = True
-    guardar_usuarios(USUARIOS)
+    TOKENS.marcar_usado(token_str)
+    ALMACEN.guardar(usuario, USUARIOS)
     return usuario
 
 def login(email: str, password: str) -> Usuario:
-    usuario: Optional[Usuario] = next(
-        (u for u in USUARIOS.values() if u.email == email),
-        None
-    )
+    usuario: Optional[Usuario] = REPOSITORIO.por_email(email)
     if not usuario:
         raise ValueError("Credenciales inválidas")
 
@@ -85,4 +75,10 @@ def login(email: str, password: str) -> Usuario:
     if not usuario.verificar_password(password):
         raise ValueError("Credenciales inválidas")
 
-    return usuario
+    if usuario.necesita_rehash():
+        # Hash heredado (SHA-256 sin sal), de otro algoritmo o de un costo
+        # menor: se reemplaza ahora que tenemos la contraseña en claro.
+        usuario.password_hash = Usuario.hash_password(password)
+        ALMACEN.guardar(usuario, USUARIOS)
+
+    return usuario
\ No newline at end of file
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Dict
+from .models import Usuario, Rol, EstadoCuenta
+
+# Cambios en el log antes de reescribir la foto completa
+COMPACTAR_CADA = 1000
+
+def usuario_a_dict(u: Usuario) -> dict:
+    return {
+        "nombre": u.nombre,
+        "email": u.email,
+        "password_hash": u.password_hash,
+        "estado": u.estado.value,
+        "roles": [r.nombre for r in u.roles]
+    }
+
+def usuario_de_dict(user_id: str, u: dict) -> Usuario:
+    return Usuario(
+        id=user_id,
+        nombre=u["nombre"],
+        email=u["email"],
+        password_hash=u["password_hash"],
+        estado=EstadoCuenta(u["estado"]),
+        roles=[Rol(nombre=r) for r in u.get("roles", [])]
+    )
+
+def escribir_atomico(path: str, texto: str) -> None:
+    """Escribe en un temporal de la misma carpeta y lo renombra encima de 'path'."""
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                               dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(texto)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+class AlmacenUsuarios:
+    """
+    Persistencia de usuarios en dos archivos:
+    - 'path' (users_db.json): foto completa, mismo formato de siempre.
+    - 'path.log': un cambio por línea ({"op": "put"|"del", "id", "u"}),
+      que se agrega al final con fsync. Registrar o confirmar es O(1).
+    Cada COMPACTAR_CADA cambios la foto se reescribe (temporal + rename) y
+    el log se vacía. Reaplicar un log sobre una foto que ya lo incluye da
+    lo mismo, así que un corte entre ambos pasos no pierde nada; una última
+    línea cortada por un crash se descarta al cargar.
+    """
+
+    def __init__(self, path: str, compactar_cada: int = COMPACTAR_CADA):
+        self.path = path
+        self.log_path = path + ".log"
+        self.compactar_cada = compactar_cada
+        self._pendientes = 0
+        self._lock = threading.Lock()  # login (rehash) escribe desde el pool del KDF
+
+    def cargar(self) -> Dict[str, Usuario]:
+        data: Dict[str, dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        self._pendientes = 0
+        if os.path.exists(self.log_path):
+            buenas = []
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                lineas = f.readlines()
+            for linea in lineas:
+                try:
+                    cambio = json.loads(linea)
+                except ValueError:
+                    break  # escritura interrumpida: lo que sigue no es confiable
+                if cambio["op"] == "put":
+                    data[cambio["id"]] = cambio["u"]
+                else:
+                    data.pop(cambio["id"], None)
+                buenas.append(linea if linea.endswith("\n") else linea + "\n")
+            if buenas != lineas:
+                # Se sacan los restos para que el próximo cambio no quede pegado a ellos
+                escribir_atomico(self.log_path, "".join(buenas))
+            self._pendientes = len(buenas)
+        return {user_id: usuario_de_dict(user_id, u) for user_id, u in data.items()}
+
+    def _anotar(self, cambio: dict) -> None:
+        with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self._pendientes += 1
+
+    def guardar(self, usuario: Usuario, usuarios: Dict[str, Usuario]) -> None:
+        """Registra el alta o cambio de 'usuario'; 'usuarios' (todos) sirve para compactar."""
+        self._anotar({"op": "put", "id": usuario.id, "u": usuario_a_dict(usuario)})
+        if self._pendientes >= self.compactar_cada:
+            self.compactar(usuarios)
+
+    def borrar(self, user_id: str, usuarios: Dict[str, Usuario]) -> None:
+        self._anotar({"op": "del", "id": user_id})
+        if self._pendientes >= self.compactar_cada:
+            self.compactar(usuarios)
+
+    def compactar(self, usuarios: Dict[str, Usuario]) -> None:
+        """Reescribe la foto con 'usuarios' y vacía el log, ambos de forma atómica."""
+        with self._lock:
+            data = {user_id: usuario_a_dict(u) for user_id, u in list(usuarios.items())}
+            escribir_atomico(self.path, json.dumps(data, indent=2, ensure_ascii=False))
+            if os.path.exists(self.log_path):
+                escribir_atomico(self.log_path, "")
+            self._pendientes = 0
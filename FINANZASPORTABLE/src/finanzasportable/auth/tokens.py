@@ -0,0 +1,87 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from ..services.db import connect
+from .models import TokenConfirmacion
+
+# Cada cuántas altas se purgan los vencidos y usados
+PURGAR_CADA = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_confirmacion(
+  token TEXT PRIMARY KEY,
+  usuario_id TEXT NOT NULL,
+  fecha_creacion TEXT NOT NULL,     -- ISO, UTC
+  fecha_vencimiento TEXT NOT NULL,  -- ISO, UTC
+  usado INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_token_vencimiento ON token_confirmacion(fecha_vencimiento);
+CREATE INDEX IF NOT EXISTS ix_token_usado ON token_confirmacion(token) WHERE usado = 1;
+"""
+
+class AlmacenTokens:
+    """
+    Tokens de confirmación en SQLite: sobreviven a reinicios y se comparten
+    entre procesos (gui_auth y app.gui_mp). Búsqueda por la clave primaria;
+    purgar() borra por los índices de vencimiento y de usados, así que cuesta
+    lo que haya para borrar y no lo que haya guardado.
+    """
+
+    def __init__(self, path: Path, purgar_cada: int = PURGAR_CADA):
+        self.path = Path(path)
+        self.purgar_cada = purgar_cada
+        self._altas = 0
+        self._listo = False
+
+    def _con(self):
+        if not self._listo:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with connect(self.path) as con:
+                con.executescript(_SCHEMA)
+            self._listo = True
+        return connect(self.path)
+
+    def guardar(self, token: TokenConfirmacion) -> None:
+        with self._con() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO token_confirmacion VALUES (?,?,?,?,?)",
+                (token.token, token.usuario_id, token.fecha_creacion.isoformat(),
+                 token.fecha_vencimiento.isoformat(), int(token.usado)),
+            )
+        self._altas += 1
+        if self._altas >= self.purgar_cada:
+            self.purgar()
+
+    def get(self, token_str: str) -> Optional[TokenConfirmacion]:
+        with self._con() as con:
+            row = con.execute(
+                "SELECT usuario_id, fecha_creacion, fecha_vencimiento, usado "
+                "FROM token_confirmacion WHERE token = ?", (token_str,)
+            ).fetchone()
+        if row is None:
+            return None
+        return TokenConfirmacion(
+            token=token_str,
+            usuario_id=row[0],
+            fecha_creacion=datetime.fromisoformat(row[1]),
+            fecha_vencimiento=datetime.fromisoformat(row[2]),
+            usado=bool(row[3]),
+        )
+
+    def marcar_usado(self, token_str: str) -> None:
+        with self._con() as con:
+            con.execute("UPDATE token_confirmacion SET usado = 1 WHERE token = ?", (token_str,))
+
+    def purgar(self, ahora: Optional[datetime] = None) -> int:
+        """Borra los tokens vencidos o ya usados. Devuelve cuántos."""
+        ahora = ahora or datetime.utcnow()
+        with self._con() as con:
+            n = con.execute("DELETE FROM token_confirmacion WHERE fecha_vencimiento < ?",
+                            (ahora.isoformat(),)).rowcount
+            n += con.execute("DELETE FROM token_confirmacion WHERE usado = 1").rowcount
+        self._altas = 0
+        return n
+
+    def __len__(self) -> int:
+        with self._con() as con:
+            return con.execute("SELECT COUNT(*) FROM token_confirmacion").fetchone()[0]
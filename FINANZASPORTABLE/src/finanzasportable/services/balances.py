@@ -1,43 +1,73 @@
 from __future__ import annotations
-from .db import connect
+from .db import connect, core_source, db_exists, ensure_schema
 
 def listar_saldos_por_cuenta(db_path):
     """
-    Devuelve filas (id, name, currency, balance, metadata) por cuenta.
-    Usa la vista v_balance_por_cuenta si existe; si no, calcula con SUM().
+    Devuelve filas (id, name, currency, balance, metadata) por cuenta, con
+    el saldo en centavos.
+    Lee el saldo materializado en account_balance (O(cuentas)). Si la
+    partición todavía no existe, las cuentas de la general con saldo 0.
     """
+    if not db_exists(db_path):
+        src = core_source(db_path)
+        if not db_exists(src):
+            return []
+        ensure_schema(src)
+        with connect(src) as con:
+            return con.execute("""
+                SELECT id, name, currency, 0 AS balance, metadata
+                FROM account ORDER BY name
+            """).fetchall()
+    ensure_schema(db_path)
     with connect(db_path) as con:
-        # ¿Existe la vista?
-        has_view = con.execute("""
-            SELECT 1 FROM sqlite_master
-            WHERE type='view' AND name='v_balance_por_cuenta'
-        """).fetchone() is not None
+        return con.execute("""
+            SELECT a.id, a.name, a.currency,
+                   COALESCE(b.balance, 0) AS balance,
+                   a.metadata
+            FROM account a
+            LEFT JOIN account_balance b
+              ON b.account_id = a.id
+            ORDER BY a.name
+        """).fetchall()
 
-        if has_view:
-            sql = """
-                SELECT a.id, a.name, a.currency,
-                       COALESCE(v.balance, 0) AS balance,
-                       a.metadata
-                FROM account a
-                LEFT JOIN v_balance_por_cuenta v
-                  ON v.account_id = a.id
-                ORDER BY a.name
-            """
-        else:
-            sql = """
-                SELECT a.id, a.name, a.currency,
-                       COALESCE(SUM(t.amount), 0) AS balance,
-                       a.metadata
-                FROM account a
-                LEFT JOIN transactions t
-                  ON t.account_id = a.id
-                GROUP BY a.id, a.name, a.currency, a.metadata
-                ORDER BY a.name
-            """
-        return con.execute(sql).fetchall()
+def total_saldo(db_path) -> int:
+    """Suma en centavos de los saldos de todas las cuentas (0 si no hay datos)."""
+    if not db_exists(db_path):
+        return 0
+    ensure_schema(db_path)
+    with connect(db_path) as con:
+        row = con.execute("SELECT COALESCE(SUM(balance), 0) FROM account_balance").fetchone()
+        return int(row[0] or 0)
 
-def total_saldo(db_path) -> float:
-    """Suma global de todos los movimientos (puede ser 0 si no hay datos)."""
+def reconstruir_saldos(db_path) -> int:
+    """Recalcula account_balance desde cero. Devuelve la cantidad de cuentas con saldo."""
+    ensure_schema(db_path)
     with connect(db_path) as con:
-        row = con.execute("SELECT COALESCE(SUM(amount), 0) FROM transactions").fetchone()
-        return float(row[0] or 0.0)
+        con.execute("DELETE FROM account_balance")
+        con.execute("""
+            INSERT INTO account_balance(account_id, balance)
+            SELECT account_id, SUM(amount) FROM transactions
+            WHERE deleted_at IS NULL
+            GROUP BY account_id
+        """)
+        return con.execute("SELECT COUNT(*) FROM account_balance").fetchone()[0]
+
+def verificar_saldos(db_path) -> list[tuple[int, int, int]]:
+    """
+    Compara account_balance con la suma real de movimientos.
+    Devuelve (account_id, guardado, calculado) de las cuentas que no coinciden;
+    con centavos enteros la comparación es exacta.
+    """
+    ensure_schema(db_path)
+    with connect(db_path, profile="read-only-report") as con:
+        rows = con.execute("""
+            SELECT account_id, SUM(guardado), SUM(calculado) FROM (
+                SELECT account_id, balance AS guardado, 0 AS calculado
+                FROM account_balance
+                UNION ALL
+                SELECT account_id, 0, amount
+                FROM transactions WHERE deleted_at IS NULL
+            )
+            GROUP BY account_id
+        """).fetchall()
+    return [(r[0], r[1], r[2]) for r in rows if r[1] != r[2]]
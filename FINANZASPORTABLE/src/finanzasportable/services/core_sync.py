@@ -1,52 +1,73 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+import os
 import sqlite3
-from .db import connect, ensure_schema, db_path_general
+import time
+from .db import (
+    connect, db_path_general, ensure_schema, iter_db_files, release_connection,
+    sync_core_from_general,
+)
 
 def ensure_core_cloned(dst_path: Path) -> None:
     """
-    Garantiza que la BD 'dst_path' tenga institution/account/category copiadas
-    desde la BD general. Usa INSERT OR IGNORE para evitar duplicados.
+    Garantiza que la BD 'dst_path' tenga institution/account/category al día
+    con la BD general. La primera vez copia todo; después solo aplica los
+    cambios registrados en general.db (altas, renombres y bajas).
     Seguro contra 'database is locked' y siempre DETACH al final.
     """
-    ensure_schema(dst_path)  # por si es una base nueva
+    sync_core_from_general(dst_path)
 
-    gen_path = db_path_general()
-    with connect(dst_path) as con:
-        # Evitar bloqueos y mejorar concurrencia
-        con.execute("PRAGMA busy_timeout=5000")
-        con.execute("PRAGMA journal_mode=WAL")
+@dataclass
+class SyncResult:
+    path: Path
+    version: int = 0         # versión del core que quedó aplicada
+    skipped: bool = False    # ya estaba al día: no se adjuntó la general
+    seconds: float = 0.0
+    error: str | None = None
 
-        # Si ya hay filas en account, asumimos que el core existe y no clonamos de nuevo
-        row = con.execute("SELECT COUNT(*) FROM account").fetchone()
-        if row and int(row[0]) > 0:
-            return
+def core_version(gen_path: Path | None = None) -> int:
+    """Última versión del registro de cambios del core en la general."""
+    gen_path = gen_path or db_path_general()
+    ensure_schema(gen_path)
+    with connect(gen_path) as con:
+        return con.execute("SELECT IFNULL(MAX(version), 0) FROM core_changelog").fetchone()[0]
 
+def _applied_version(path: Path) -> int | None:
+    with connect(path) as con:
         try:
-            con.execute("ATTACH DATABASE ? AS gen", (str(gen_path),))
+            row = con.execute("SELECT version FROM core_sync_state WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:  # base anterior a la migración 4
+            return None
+    return row[0] if row else None
 
-            # Copiar instituciones
-            con.execute("""
-                INSERT OR IGNORE INTO institution(id, name, alias)
-                SELECT id, name, alias FROM gen.institution;
-            """)
+def _sync_one(path: Path, gen_path: Path, latest: int) -> SyncResult:
+    t0 = time.perf_counter()
+    result = SyncResult(path)
+    try:
+        if _applied_version(path) == latest:
+            result.version, result.skipped = latest, True
+        else:
+            result.version = sync_core_from_general(path, gen_path)
+    except Exception as exc:  # un archivo roto no frena al resto
+        result.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        release_connection(path)
+        result.seconds = time.perf_counter() - t0
+    return result
 
-            # Copiar cuentas
-            con.execute("""
-                INSERT OR IGNORE INTO account(id, institution_id, name, type, currency, metadata)
-                SELECT id, institution_id, name, type, currency, metadata
-                FROM gen.account;
-            """)
-
-            # Copiar categorías
-            con.execute("""
-                INSERT OR IGNORE INTO category(id, name, type)
-                SELECT id, name, type FROM gen.category;
-            """)
-
-            con.commit()
-        finally:
-            try:
-                con.execute("DETACH DATABASE gen")
-            except sqlite3.OperationalError:
-                pass
+def sync_all(data_dir: Path | None = None, gen_path: Path | None = None,
+             workers: int | None = None) -> list[SyncResult]:
+    """
+    Sincroniza el core de la general con todas las bases de la carpeta de
+    datos (YYYY.db y YYYY-MM.db), de a 'workers' hilos a la vez. Las que ya
+    están en la versión actual se saltean sin adjuntar nada. Devuelve un
+    SyncResult por archivo, en orden de nombre; los errores no se propagan.
+    """
+    gen_path = Path(gen_path or (Path(data_dir) / "general.db" if data_dir else db_path_general()))
+    paths = [p for p in iter_db_files(data_dir) if p.name != gen_path.name]
+    latest = core_version(gen_path)
+    workers = workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="core-sync") as pool:
+        return list(pool.map(lambda p: _sync_one(p, gen_path, latest), paths))
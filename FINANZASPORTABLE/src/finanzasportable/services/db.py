@@ -1,6 +1,11 @@
 from __future__ import annotations
 from pathlib import Path
+import atexit
+import os
+import re
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 
 # --- Carpeta de datos ---
@@ -17,16 +22,178 @@ def db_path_year(year: int) -> Path:
 def db_path_month(year: int, month: int) -> Path:
     return DATA_DIR / f"{year}-{month:02d}.db"
 
+# --- Pool de conexiones ---
+# Una conexión abierta por (ruta, hilo): sqlite3 no comparte conexiones entre
+# hilos de forma segura, así que cada hilo reutiliza la suya. Las conexiones
+# ociosas más de POOL_IDLE_TIMEOUT segundos, o abiertas hace más de
+# POOL_MAX_AGE, se cierran en la siguiente adquisición.
+POOL_IDLE_TIMEOUT = 300.0
+POOL_MAX_AGE = 3600.0
+POOL_CACHED_STATEMENTS = 256
+
+# --- Perfiles de PRAGMA ---
+# Se aplican al prestar la conexión (solo si cambia el perfil). WAL es
+# persistente en el archivo; el resto es por conexión. cache_size negativo
+# está en KiB.
+PRAGMA_PROFILES: dict[str, dict[str, object]] = {
+    "interactive": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "query_only": 0,
+    },
+    "bulk-import": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 30000,
+        "cache_size": -65536,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "query_only": 0,
+    },
+    "read-only-report": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -32000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "query_only": 1,
+    },
+}
+DEFAULT_PROFILE = "interactive"
+
+def _apply_profile(con: sqlite3.Connection, profile: str) -> None:
+    pragmas = PRAGMA_PROFILES.get(profile)
+    if pragmas is None:
+        raise ValueError(f"Perfil de PRAGMA desconocido: {profile}")
+    for key, value in pragmas.items():
+        con.execute(f"PRAGMA {key}={value}")
+
+def _file_identity(path) -> tuple[int, int] | None:
+    """(st_dev, st_ino) del archivo, o None si no existe."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+class _PooledConnection:
+    __slots__ = ("con", "thread_id", "identity", "opened_at", "last_used", "depth", "profile")
+
+    def __init__(self, con: sqlite3.Connection, thread_id: int, identity, now: float):
+        self.con = con
+        self.identity = identity
+        self.thread_id = thread_id
+        self.opened_at = now
+        self.last_used = now
+        self.depth = 0
+        self.profile: str | None = None
+
+_POOL: dict[tuple[str, int], _PooledConnection] = {}
+_POOL_LOCK = threading.Lock()
+
+def configure_pool(idle_timeout: float | None = None, max_age: float | None = None) -> None:
+    """Ajusta la vida útil de las conexiones del pool (en segundos)."""
+    global POOL_IDLE_TIMEOUT, POOL_MAX_AGE
+    if idle_timeout is not None:
+        POOL_IDLE_TIMEOUT = float(idle_timeout)
+    if max_age is not None:
+        POOL_MAX_AGE = float(max_age)
+
+def _evict_expired(now: float) -> None:
+    """Cierra conexiones vencidas o de hilos que ya terminaron (con el lock tomado)."""
+    if not _POOL:
+        return
+    alive = {t.ident for t in threading.enumerate()}
+    for key, entry in list(_POOL.items()):
+        if entry.depth:
+            continue
+        if (entry.thread_id not in alive
+                or now - entry.last_used > POOL_IDLE_TIMEOUT
+                or now - entry.opened_at > POOL_MAX_AGE):
+            del _POOL[key]
+            entry.con.close()
+
+def _acquire(path: Path) -> _PooledConnection:
+    thread_id = threading.get_ident()
+    key = (os.path.abspath(path), thread_id)
+    now = time.monotonic()
+    with _POOL_LOCK:
+        _evict_expired(now)
+        entry = _POOL.get(key)
+        if entry is not None and not entry.depth and entry.identity != _file_identity(path):
+            # El archivo fue borrado o reemplazado: la conexión apunta al viejo.
+            del _POOL[key]
+            entry.con.close()
+            entry = None
+        if entry is None:
+            # check_same_thread=False solo para poder cerrarla desde otro hilo
+            # en close_all_connections(); el pool ya garantiza la afinidad.
+            con = sqlite3.connect(path, check_same_thread=False,
+                                  cached_statements=POOL_CACHED_STATEMENTS)
+            con.row_factory = sqlite3.Row
+            entry = _POOL[key] = _PooledConnection(con, thread_id, _file_identity(path), now)
+        entry.depth += 1
+        entry.last_used = now
+    return entry
+
+def release_connection(path: Path) -> None:
+    """
+    Cierra la conexión del hilo actual a 'path' si no está en uso. Para
+    recorridos sobre muchas bases desde hilos de larga vida (un pool), que
+    si no dejarían un archivo abierto por base hasta terminar.
+    """
+    key = (os.path.abspath(path), threading.get_ident())
+    with _POOL_LOCK:
+        entry = _POOL.get(key)
+        if entry is None or entry.depth:
+            return
+        del _POOL[key]
+    entry.con.close()
+
+def close_all_connections() -> None:
+    """Cierra todas las conexiones del pool (se llama también al salir del proceso)."""
+    with _POOL_LOCK:
+        entries = list(_POOL.values())
+        _POOL.clear()
+    for entry in entries:
+        try:
+            entry.con.close()
+        except sqlite3.Error:
+            pass
+
+atexit.register(close_all_connections)
+
 # --- Conexión (context manager) ---
 @contextmanager
-def connect(path: Path):
-    con = sqlite3.connect(path)
-    con.row_factory = sqlite3.Row
+def connect(path: Path, profile: str = DEFAULT_PROFILE):
+    """
+    Presta la conexión del pool para 'path' en el hilo actual, con el perfil
+    de PRAGMA indicado ("interactive", "bulk-import", "read-only-report").
+    Al salir hace commit (o rollback si hubo excepción) pero no la cierra.
+    Los 'with connect()' anidados sobre la misma ruta comparten transacción
+    y perfil: solo el más externo los define y confirma o deshace.
+    """
+    entry = _acquire(path)
+    con = entry.con
     try:
+        if entry.depth == 1 and entry.profile != profile:
+            _apply_profile(con, profile)
+            entry.profile = profile
         yield con
-        con.commit()
+        if entry.depth == 1:
+            con.commit()
+    except BaseException:
+        if entry.depth == 1:
+            con.rollback()
+        raise
     finally:
-        con.close()
+        entry.depth -= 1
+        entry.last_used = time.monotonic()
 
 # --- Esquema base ---
 SCHEMA = """
@@ -56,7 +223,7 @@ CREATE TABLE IF NOT EXISTS transactions(
   category_id INTEGER,
   posted_at TEXT NOT NULL,         -- ISO YYYY-MM-DD
   description TEXT DEFAULT '',
-  amount REAL NOT NULL,
+  amount INTEGER NOT NULL,         -- centavos
   currency TEXT NOT NULL DEFAULT 'ARS',
   deleted_at TEXT DEFAULT NULL,
   FOREIGN KEY(account_id) REFERENCES account(id),
@@ -70,12 +237,317 @@ LEFT JOIN transactions t ON t.account_id = a.id
 GROUP BY a.id,a.name,a.currency;
 """
 
+# --- Migraciones (PRAGMA user_version) ---
+# SCHEMA es la versión 0; MIGRATIONS[n-1] lleva una base de la versión n-1 a la n.
+# Nunca se editan migraciones ya publicadas: se agregan nuevas al final.
+MIGRATIONS: list[str] = [
+    # 1: índices para el listado de actividad, los saldos y la búsqueda de
+    #    cuentas por nombre. Antes del índice único se fusionan las cuentas
+    #    repetidas de la misma institución y moneda (gana el id más bajo y se
+    #    le reasignan los movimientos); las que difieren en alguna de las dos
+    #    se renombran a "nombre (id)".
+    """
+    UPDATE transactions
+       SET account_id = (SELECT MIN(a2.id) FROM account a1
+                         JOIN account a2 ON a2.name = a1.name
+                                        AND a2.institution_id = a1.institution_id
+                                        AND a2.currency = a1.currency
+                         WHERE a1.id = transactions.account_id)
+     WHERE account_id IN (SELECT a.id FROM account a
+                          WHERE EXISTS (SELECT 1 FROM account b
+                                        WHERE b.name = a.name AND b.id < a.id
+                                          AND b.institution_id = a.institution_id
+                                          AND b.currency = a.currency));
+    DELETE FROM account
+     WHERE EXISTS (SELECT 1 FROM account b
+                   WHERE b.name = account.name AND b.id < account.id
+                     AND b.institution_id = account.institution_id
+                     AND b.currency = account.currency);
+    UPDATE account SET name = name || ' (' || id || ')'
+     WHERE EXISTS (SELECT 1 FROM account b
+                   WHERE b.name = account.name AND b.id < account.id);
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_account_name ON account(name);
+    CREATE INDEX IF NOT EXISTS ix_transactions_account_live
+        ON transactions(account_id, deleted_at, amount);
+    CREATE INDEX IF NOT EXISTS ix_transactions_posted
+        ON transactions(posted_at DESC, id DESC);
+    """,
+    # 2: saldo materializado por cuenta, mantenido por triggers sobre
+    #    transactions (solo cuentan los movimientos con deleted_at NULL).
+    #    La vista v_balance_por_cuenta pasa a leer de esta tabla.
+    """
+    CREATE TABLE IF NOT EXISTS account_balance(
+      account_id INTEGER PRIMARY KEY,
+      balance REAL NOT NULL DEFAULT 0
+    );
+    DELETE FROM account_balance;
+    INSERT INTO account_balance(account_id, balance)
+    SELECT account_id, SUM(amount) FROM transactions
+     WHERE deleted_at IS NULL GROUP BY account_id;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_ins
+    AFTER INSERT ON transactions WHEN NEW.deleted_at IS NULL
+    BEGIN
+      INSERT INTO account_balance(account_id, balance) VALUES (NEW.account_id, NEW.amount)
+      ON CONFLICT(account_id) DO UPDATE SET balance = balance + excluded.balance;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_del
+    AFTER DELETE ON transactions WHEN OLD.deleted_at IS NULL
+    BEGIN
+      UPDATE account_balance SET balance = balance - OLD.amount
+       WHERE account_id = OLD.account_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_upd
+    AFTER UPDATE OF account_id, amount, deleted_at ON transactions
+    BEGIN
+      UPDATE account_balance SET balance = balance - OLD.amount
+       WHERE account_id = OLD.account_id AND OLD.deleted_at IS NULL;
+      INSERT INTO account_balance(account_id, balance)
+      SELECT NEW.account_id, NEW.amount WHERE NEW.deleted_at IS NULL
+      ON CONFLICT(account_id) DO UPDATE SET balance = balance + excluded.balance;
+    END;
+
+    DROP VIEW IF EXISTS v_balance_por_cuenta;
+    CREATE VIEW v_balance_por_cuenta AS
+    SELECT a.id AS account_id, a.name AS account_name, a.currency,
+           IFNULL(b.balance, 0) AS balance
+    FROM account a
+    LEFT JOIN account_balance b ON b.account_id = a.id;
+    """,
+    # 3: huella de contenido de las transacciones importadas (ver
+    #    importer._fingerprints). Las cargas a mano y las importadas antes
+    #    de esta versión quedan en NULL, que el índice único no restringe.
+    """
+    ALTER TABLE transactions ADD COLUMN fingerprint INTEGER;
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_transactions_fingerprint
+        ON transactions(fingerprint);
+    """,
+    # 4: registro de cambios del core (institution/account/category) para
+    #    sincronizar particiones de forma incremental (ver
+    #    sync_core_from_general). 'version' solo crece; cada partición guarda
+    #    en core_sync_state hasta qué versión de la general aplicó.
+    """
+    CREATE TABLE IF NOT EXISTS core_changelog(
+      version INTEGER PRIMARY KEY AUTOINCREMENT,
+      tbl TEXT NOT NULL,
+      row_id INTEGER NOT NULL,
+      op TEXT NOT NULL CHECK(op IN ('U','D'))
+    );
+    CREATE TABLE IF NOT EXISTS core_sync_state(
+      id INTEGER PRIMARY KEY CHECK(id = 1),
+      version INTEGER NOT NULL
+    );
+
+    CREATE TRIGGER IF NOT EXISTS trg_institution_changelog_ins AFTER INSERT ON institution
+    BEGIN INSERT INTO core_changelog(tbl, row_id, op) VALUES ('institution', NEW.id, 'U'); END;
+    CREATE TRIGGER IF NOT EXISTS trg_institution_changelog_upd AFTER UPDATE ON institution
+    BEGIN
+      INSERT INTO core_changelog(tbl, row_id, op) SELECT 'institution', OLD.id, 'D' WHERE OLD.id <> NEW.id;
+      INSERT INTO core_changelog(tbl, row_id, op) VALUES ('institution', NEW.id, 'U');
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_institution_changelog_del AFTER DELETE ON institution
+    BEGIN INSERT INTO core_changelog(tbl, row_id, op) VALUES ('institution', OLD.id, 'D'); END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_account_changelog_ins AFTER INSERT ON account
+    BEGIN INSERT INTO core_changelog(tbl, row_id, op) VALUES ('account', NEW.id, 'U'); END;
+    CREATE TRIGGER IF NOT EXISTS trg_account_changelog_upd AFTER UPDATE ON account
+    BEGIN
+      INSERT INTO core_changelog(tbl, row_id, op) SELECT 'account', OLD.id, 'D' WHERE OLD.id <> NEW.id;
+      INSERT INTO core_changelog(tbl, row_id, op) VALUES ('account', NEW.id, 'U');
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_account_changelog_del AFTER DELETE ON account
+    BEGIN INSERT INTO core_changelog(tbl, row_id, op) VALUES ('account', OLD.id, 'D'); END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_category_changelog_ins AFTER INSERT ON category
+    BEGIN INSERT INTO core_changelog(tbl, row_id, op) VALUES ('category', NEW.id, 'U'); END;
+    CREATE TRIGGER IF NOT EXISTS trg_category_changelog_upd AFTER UPDATE ON category
+    BEGIN
+      INSERT INTO core_changelog(tbl, row_id, op) SELECT 'category', OLD.id, 'D' WHERE OLD.id <> NEW.id;
+      INSERT INTO core_changelog(tbl, row_id, op) VALUES ('category', NEW.id, 'U');
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_category_changelog_del AFTER DELETE ON category
+    BEGIN INSERT INTO core_changelog(tbl, row_id, op) VALUES ('category', OLD.id, 'D'); END;
+    """,
+    # 5: montos en centavos enteros (INTEGER) en lugar de REAL: sumas exactas
+    #    en account_balance y en los reportes. Una columna REAL guarda como
+    #    float hasta a los enteros, así que transactions y account_balance se
+    #    reconstruyen con el tipo nuevo (mismos ids, índices y triggers). Una
+    #    base creada con SCHEMA ya tiene amount INTEGER: no se multiplica.
+    """
+    CREATE TABLE transactions_new(
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      account_id INTEGER NOT NULL,
+      category_id INTEGER,
+      posted_at TEXT NOT NULL,         -- ISO YYYY-MM-DD
+      description TEXT DEFAULT '',
+      amount INTEGER NOT NULL,         -- centavos
+      currency TEXT NOT NULL DEFAULT 'ARS',
+      deleted_at TEXT DEFAULT NULL,
+      fingerprint INTEGER,
+      FOREIGN KEY(account_id) REFERENCES account(id),
+      FOREIGN KEY(category_id) REFERENCES category(id)
+    );
+    INSERT INTO transactions_new(id, account_id, category_id, posted_at, description,
+                                 amount, currency, deleted_at, fingerprint)
+    SELECT id, account_id, category_id, posted_at, description,
+           CASE WHEN (SELECT type FROM pragma_table_info('transactions')
+                       WHERE name = 'amount') = 'INTEGER'
+                THEN amount ELSE CAST(ROUND(amount * 100) AS INTEGER) END,
+           currency, deleted_at, fingerprint
+    FROM transactions;
+    UPDATE sqlite_sequence
+       SET seq = MAX(seq, IFNULL((SELECT seq FROM sqlite_sequence WHERE name = 'transactions'), 0))
+     WHERE name = 'transactions_new';
+    DROP TABLE transactions;
+    ALTER TABLE transactions_new RENAME TO transactions;
+    CREATE INDEX ix_transactions_account_live
+        ON transactions(account_id, deleted_at, amount);
+    CREATE INDEX ix_transactions_posted
+        ON transactions(posted_at DESC, id DESC);
+    CREATE UNIQUE INDEX ux_transactions_fingerprint
+        ON transactions(fingerprint);
+
+    DROP VIEW IF EXISTS v_balance_por_cuenta;
+    DROP TABLE account_balance;
+    CREATE TABLE account_balance(
+      account_id INTEGER PRIMARY KEY,
+      balance INTEGER NOT NULL DEFAULT 0   -- centavos
+    );
+    INSERT INTO account_balance(account_id, balance)
+    SELECT account_id, SUM(amount) FROM transactions
+     WHERE deleted_at IS NULL GROUP BY account_id;
+
+    CREATE TRIGGER trg_transactions_balance_ins
+    AFTER INSERT ON transactions WHEN NEW.deleted_at IS NULL
+    BEGIN
+      INSERT INTO account_balance(account_id, balance) VALUES (NEW.account_id, NEW.amount)
+      ON CONFLICT(account_id) DO UPDATE SET balance = balance + excluded.balance;
+    END;
+
+    CREATE TRIGGER trg_transactions_balance_del
+    AFTER DELETE ON transactions WHEN OLD.deleted_at IS NULL
+    BEGIN
+      UPDATE account_balance SET balance = balance - OLD.amount
+       WHERE account_id = OLD.account_id;
+    END;
+
+    CREATE TRIGGER trg_transactions_balance_upd
+    AFTER UPDATE OF account_id, amount, deleted_at ON transactions
+    BEGIN
+      UPDATE account_balance SET balance = balance - OLD.amount
+       WHERE account_id = OLD.account_id AND OLD.deleted_at IS NULL;
+      INSERT INTO account_balance(account_id, balance)
+      SELECT NEW.account_id, NEW.amount WHERE NEW.deleted_at IS NULL
+      ON CONFLICT(account_id) DO UPDATE SET balance = balance + excluded.balance;
+    END;
+
+    CREATE VIEW v_balance_por_cuenta AS
+    SELECT a.id AS account_id, a.name AS account_name, a.currency,
+           IFNULL(b.balance, 0) AS balance
+    FROM account a
+    LEFT JOIN account_balance b ON b.account_id = a.id;
+    """,
+    # 6: listado de actividad filtrado por cuenta. Con el índice por
+    #    (account_id, deleted_at, amount) cada página ordenaba todos los
+    #    movimientos de la cuenta; este ya los entrega en el orden del listado.
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_account_posted
+        ON transactions(account_id, posted_at DESC, id DESC)
+        WHERE deleted_at IS NULL;
+    """,
+    # 7: ids del core que llegaron de la general. Las demás filas se crearon
+    #    en la partición y, si la general da de alta la misma id, se
+    #    renumeran en lugar de pisarse (ver _renumber_local). Lo que ya
+    #    estaba se toma como sincronizado salvo que figure en el registro de
+    #    cambios local, donde solo quedan las altas hechas en la partición.
+    """
+    CREATE TABLE IF NOT EXISTS core_synced(
+      tbl TEXT NOT NULL,
+      id INTEGER NOT NULL,
+      PRIMARY KEY(tbl, id)
+    ) WITHOUT ROWID;
+    INSERT OR IGNORE INTO core_synced(tbl, id)
+    SELECT 'institution', id FROM institution
+     WHERE id NOT IN (SELECT row_id FROM core_changelog WHERE tbl = 'institution');
+    INSERT OR IGNORE INTO core_synced(tbl, id)
+    SELECT 'account', id FROM account
+     WHERE id NOT IN (SELECT row_id FROM core_changelog WHERE tbl = 'account');
+    INSERT OR IGNORE INTO core_synced(tbl, id)
+    SELECT 'category', id FROM category
+     WHERE id NOT IN (SELECT row_id FROM core_changelog WHERE tbl = 'category');
+    """,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def migrate(con: sqlite3.Connection) -> int:
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción.
+    Devuelve la versión final (una base más nueva que la app no se toca).
+    """
+    version = con.execute("PRAGMA user_version").fetchone()[0]
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        try:
+            con.executescript(
+                f"BEGIN;\n{MIGRATIONS[target - 1]}\nPRAGMA user_version={target};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if con.in_transaction:
+                con.rollback()
+            raise
+    return max(version, SCHEMA_VERSION)
+
+# --- Caché de esquema verificado (por proceso) ---
+# ruta absoluta -> (st_dev, st_ino, user_version) del archivo ya verificado.
+# No se usa mtime porque cambia con cada escritura; si el archivo se borra o
+# se reemplaza, cambia el inodo y se vuelve a verificar.
+_SCHEMA_OK: dict[str, tuple[int, int, int]] = {}
+
+def schema_verified(path: Path) -> bool:
+    cached = _SCHEMA_OK.get(os.path.abspath(path))
+    if cached is None or cached[2] < SCHEMA_VERSION:
+        return False
+    return cached[:2] == _file_identity(path)
+
+def forget_schema(path: Path | None = None) -> None:
+    """Olvida la verificación de 'path' (o de todas las bases)."""
+    if path is None:
+        _SCHEMA_OK.clear()
+    else:
+        _SCHEMA_OK.pop(os.path.abspath(path), None)
+
 def ensure_schema(path: Path):
+    """Crea/migra el esquema una sola vez por base y por proceso."""
+    if schema_verified(path):
+        return
     path.parent.mkdir(parents=True, exist_ok=True)
     with connect(path) as con:
         con.executescript(SCHEMA)
+        version = migrate(con)
+    identity = _file_identity(path)
+    if identity is not None:
+        _SCHEMA_OK[os.path.abspath(path)] = (*identity, version)
+
+_DB_NAME_RE = re.compile(r"general\.db|\d{4}\.db|\d{4}-\d{2}\.db")
+
+def iter_db_files(data_dir: Path | None = None) -> list[Path]:
+    """general.db, YYYY.db y YYYY-MM.db existentes en la carpeta de datos."""
+    data_dir = Path(data_dir or DATA_DIR)
+    return sorted(p for p in data_dir.glob("*.db") if _DB_NAME_RE.fullmatch(p.name))
+
+def upgrade_all(data_dir: Path | None = None) -> dict[Path, int]:
+    """Lleva todas las bases de la carpeta de datos a SCHEMA_VERSION, en el lugar."""
+    return {p: _upgrade_one(p) for p in iter_db_files(data_dir)}
+
+def _upgrade_one(path: Path) -> int:
+    ensure_schema(path)
+    with connect(path) as con:
+        return con.execute("PRAGMA user_version").fetchone()[0]
 
 def db_empty_of_core_tables(path: Path) -> bool:
+    if schema_verified(path):
+        return False
     with connect(path) as con:
         tables = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
     return not {"institution", "account", "category"}.issubset(tables)
@@ -105,45 +577,162 @@ def clone_core_from_general(target: Path):
                 vals = [r[c] for c in cols_no_id]
                 ct.execute("INSERT INTO ?(?) VALUES (?)", (t, collist, placeholders), vals)
 
-# --- Sincronización segura del "core" (evita 'database ... is locked') ---
-def sync_core_from_general(dst_path: Path):
+# --- Sincronización incremental del "core" (evita 'database ... is locked') ---
+# Columnas que se copian de cada tabla core, en orden de dependencia.
+CORE_TABLES: dict[str, tuple[str, ...]] = {
+    "institution": ("id", "name", "alias"),
+    "account": ("id", "institution_id", "name", "type", "currency", "metadata"),
+    "category": ("id", "name", "type"),
+}
+
+# Quién referencia a cada tabla core dentro de una base (tabla, columna).
+CORE_REFERENCES: dict[str, tuple[str, str]] = {
+    "institution": ("account", "institution_id"),
+    "account": ("transactions", "account_id"),
+    "category": ("transactions", "category_id"),
+}
+
+def _renumber_local(con: sqlite3.Connection, table: str, where: str, params=()) -> None:
+    """
+    Mueve a una id libre (mayor que todas las de main y gen) las filas
+    creadas en la partición cuya id la general acaba de usar para otra
+    cosa, junto con sus referencias: sus movimientos siguen en la misma
+    cuenta o categoría y la fila de la general entra con su id.
+    """
+    ref_table, ref_col = CORE_REFERENCES[table]
+    local = [r[0] for r in con.execute(f"""
+        SELECT id FROM main.{table}
+         WHERE id IN (SELECT id FROM gen.{table} WHERE {where})
+           AND id NOT IN (SELECT id FROM main.core_synced WHERE tbl = ?)
+    """, (*params, table))]
+    if not local:
+        return
+    next_id = con.execute(f"""
+        SELECT MAX(IFNULL((SELECT MAX(id) FROM main.{table}), 0),
+                   IFNULL((SELECT MAX(id) FROM gen.{table}), 0))
+    """).fetchone()[0]
+    for old in local:
+        next_id += 1
+        con.execute(f"UPDATE main.{table} SET id = ? WHERE id = ?", (next_id, old))
+        con.execute(f"UPDATE main.{ref_table} SET {ref_col} = ? WHERE {ref_col} = ?", (next_id, old))
+
+def _upsert_core(con: sqlite3.Connection, table: str, where: str, params=()) -> bool:
+    """
+    Copia de gen.<table> a main.<table> las filas que cumplen 'where': borra
+    esas ids en main y las vuelve a insertar desde gen, en la misma
+    transacción, así un intercambio de nombres (1:Caja→X, 2:Banco→Caja,
+    1:X→Banco) no choca con el índice único. Solo se pisan filas que ya
+    venían de la general; las locales con la misma id se renumeran antes.
+    Devuelve False si alguna fila no entró (una fila local con el mismo
+    nombre y otra id).
+    """
+    cols = ", ".join(CORE_TABLES[table])
+    _renumber_local(con, table, where, params)
+    expected = con.execute(f"SELECT COUNT(*) FROM gen.{table} WHERE {where}", params).fetchone()[0]
+    con.execute(f"DELETE FROM main.{table} WHERE id IN (SELECT id FROM gen.{table} WHERE {where})", params)
+    applied = con.execute(f"""
+        INSERT OR IGNORE INTO main.{table}({cols})
+        SELECT {cols} FROM gen.{table} WHERE {where}
+    """, params).rowcount
+    con.execute(f"""
+        INSERT OR IGNORE INTO main.core_synced(tbl, id)
+        SELECT ?, id FROM gen.{table} WHERE {where}
+    """, (table, *params))
+    return applied == expected
+
+def _drop_core(con: sqlite3.Connection, table: str, changed: str, params=()) -> None:
+    """
+    Baja de las filas de 'changed' que ya no están en gen.<table>. Las que
+    la base todavía usa (una cuenta con movimientos) no se borran: se
+    renombran a "nombre (id)" para liberar el nombre, conservan sus datos
+    y pasan a ser locales. Las filas creadas en la partición no se tocan.
     """
-    Copia/sincroniza institution, account y category desde la BD GENERAL hacia dst_path.
-    - Sin 'import' dentro de esta función (evita import circular).
-    - Usa busy_timeout y WAL.
+    ref_table, ref_col = CORE_REFERENCES[table]
+    gone = (f"id IN ({changed}) AND id NOT IN (SELECT id FROM gen.{table}) "
+            f"AND id IN (SELECT id FROM main.core_synced WHERE tbl = ?)")
+    params = (*params, table)
+    used = f"EXISTS (SELECT 1 FROM main.{ref_table} r WHERE r.{ref_col} = main.{table}.id)"
+    con.execute(f"UPDATE OR IGNORE main.{table} SET name = name || ' (' || id || ')' "
+                f"WHERE {gone} AND {used}", params)
+    con.execute(f"DELETE FROM main.{table} WHERE {gone} AND NOT {used}", params)
+    con.execute(f"DELETE FROM main.core_synced WHERE tbl = ? AND id IN ({changed}) "
+                f"AND id NOT IN (SELECT id FROM gen.{table})", (table, *params[:-1]))
+
+def sync_core_from_general(dst_path: Path, gen_path: Path | None = None) -> int:
+    """
+    Sincroniza institution, account y category desde la BD GENERAL (o desde
+    'gen_path') hacia dst_path y devuelve la versión del core aplicada.
+    - Solo repite los cambios de gen.core_changelog posteriores a la marca de
+      dst (core_sync_state): altas, renombres y bajas, en O(cambios).
+    - Sin marca (base nueva o anterior al registro), o si la general fue
+      reemplazada y su versión es menor, copia todo; en ese caso no borra.
+    - Las bajas de filas que dst todavía usa no se aplican (_drop_core).
+    - Si alguna fila no se pudo aplicar, la marca no avanza y se devuelve
+      la versión anterior: la próxima sincronización vuelve a intentarlo.
+    - busy_timeout y WAL vienen del perfil de connect().
     - Adjunta y SIEMPRE desadjunta (DETACH) la base 'gen' en un finally.
     """
+    gen_path = gen_path or db_path_general()
+    ensure_schema(gen_path)
     ensure_schema(dst_path)
-    gen_path = db_path_general()
 
     with connect(dst_path) as con:
-        # tolerancia a bloqueos y journaling seguro
-        con.execute("PRAGMA busy_timeout=5000")
-        con.execute("PRAGMA journal_mode=WAL")
-
         try:
             con.execute("ATTACH DATABASE ? AS gen", (str(gen_path),))
-
-            # institutions
-            con.execute("""
-                INSERT OR IGNORE INTO institution(id, name, alias)
-                SELECT id, name, alias FROM gen.institution;
-            """)
-            # accounts
-            con.execute("""
-                INSERT OR IGNORE INTO account(id, institution_id, name, type, currency, metadata)
-                SELECT id, institution_id, name, type, currency, metadata FROM gen.account;
-            """)
-            # categories
-            con.execute("""
-                INSERT OR IGNORE INTO category(id, name, type)
-                SELECT id, name, type FROM gen.category;
-            """)
-
+            latest = con.execute("SELECT IFNULL(MAX(version), 0) FROM gen.core_changelog").fetchone()[0]
+            row = con.execute("SELECT version FROM main.core_sync_state WHERE id = 1").fetchone()
+            applied = row[0] if row else None
+            if applied == latest:
+                return latest
+            # Los triggers de dst también anotan lo que se aplica acá; las
+            # particiones nunca son origen, así que esas entradas se descartan.
+            before = con.execute("SELECT IFNULL(MAX(version), 0) FROM main.core_changelog").fetchone()[0]
+            complete = True
+            if applied is None or applied > latest:
+                for table in CORE_TABLES:
+                    complete &= _upsert_core(con, table, "true")
+            else:
+                changed = ("SELECT DISTINCT row_id FROM gen.core_changelog "
+                           "WHERE tbl = ? AND version > ?")
+                # Bajas de dependientes a dueños; altas y cambios al revés
+                for table in reversed(CORE_TABLES):
+                    _drop_core(con, table, changed, (table, applied))
+                for table in CORE_TABLES:
+                    complete &= _upsert_core(con, table, f"id IN ({changed})", (table, applied))
+            con.execute("DELETE FROM main.core_changelog WHERE version > ?", (before,))
+            if complete:
+                con.execute("""
+                    INSERT INTO main.core_sync_state(id, version) VALUES (1, ?)
+                    ON CONFLICT(id) DO UPDATE SET version = excluded.version
+                """, (latest,))
             con.commit()
+            return latest if complete else (applied or 0)
         finally:
-            # Detach garantizado (aunque haya saltado una excepción)
+            # Detach garantizado (aunque haya saltado una excepción); con una
+            # transacción abierta SQLite no deja desadjuntar.
+            if con.in_transaction:
+                con.rollback()
             try:
                 con.execute("DETACH DATABASE gen")
             except sqlite3.OperationalError:
                 pass
+
+# --- Particiones perezosas ---
+# Un YYYY.db / YYYY-MM.db que no existe es una base "virtual": sin
+# movimientos y con el core de la general. Las lecturas no crean el archivo;
+# solo la primera escritura lo hace (ensure_partition).
+def db_exists(path: Path) -> bool:
+    return os.path.isfile(path)
+
+def core_source(path: Path) -> Path:
+    """Base de la que leer cuentas/categorías de 'path': ella misma o, si todavía no existe, la general."""
+    return path if db_exists(path) else Path(path).parent / "general.db"
+
+def ensure_partition(path: Path) -> None:
+    """Antes de escribir: crea la base si falta, con esquema y core de la general al día."""
+    if schema_verified(path):
+        return
+    ensure_schema(path)
+    gen_path = Path(path).parent / "general.db"
+    if Path(path).name != gen_path.name and db_exists(gen_path):
+        sync_core_from_general(path, gen_path)
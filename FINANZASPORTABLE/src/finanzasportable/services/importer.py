@@ -1,15 +1,88 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-import pandas as pd
-from typing import Dict, Tuple
-from ..services.db import connect
-from ..utils.formats import parse_amount
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterator
+from ..services.db import DATA_DIR, connect, ensure_schema, sync_core_from_general
+from ..utils.formats import format_cents, parse_amount_cents_series
+
+# pandas (y openpyxl) se importan dentro de las funciones: importar este
+# módulo no cuesta los cientos de ms de pandas hasta que se lee un archivo.
+# Para las anotaciones alcanza con el import de los chequeadores de tipos.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Filas por executemany/commit en import_rows
+IMPORT_CHUNK_ROWS = 50_000
 
 def read_any_table(path: Path, sheet: str | None = None, header_row: int = 0) -> pd.DataFrame:
+    import pandas as pd
     if str(path).lower().endswith((".xlsx",".xls")):
         return pd.read_excel(path, sheet_name=sheet or 0, header=header_row)
     return pd.read_csv(path, header=header_row)
 
+def iter_table_chunks(path: Path, chunk_rows: int, sheet: str | None = None,
+                      header_row: int = 0) -> Iterator[tuple[pd.DataFrame, float]]:
+    """
+    Lee el archivo en DataFrames de a lo sumo 'chunk_rows' filas sin cargarlo
+    entero: CSV con read_csv(chunksize=...) y .xlsx fila por fila con openpyxl
+    en modo read-only. Los .xls viejos se leen enteros (openpyxl no los abre).
+    Produce pares (bloque, fracción del archivo leída hasta ese bloque).
+    """
+    import pandas as pd
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".xls":
+        df = pd.read_excel(path, sheet_name=sheet or 0, header=header_row)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows], min(1.0, (start + chunk_rows) / len(df))
+        return
+    if suffix == ".xlsx":
+        yield from _iter_xlsx_chunks(path, chunk_rows, sheet, header_row)
+        return
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as fh:
+        for chunk in pd.read_csv(fh, header=header_row, chunksize=chunk_rows):
+            yield chunk, min(1.0, fh.tell() / size)
+
+def _iter_xlsx_chunks(path, chunk_rows, sheet, header_row):
+    import pandas as pd
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        total = ws.max_row or 0  # puede faltar la dimensión en el archivo
+        rows = ws.iter_rows(values_only=True)
+        for _ in range(header_row):
+            next(rows, None)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"Unnamed: {i}" if c is None else c for i, c in enumerate(header)]
+        done = header_row + 1
+        while True:
+            block = list(islice(rows, chunk_rows))
+            if not block:
+                break
+            done += len(block)
+            # Como read_excel: las filas totalmente vacías no cuentan
+            block = [r for r in block if any(v is not None for v in r)]
+            if not block:
+                continue
+            yield (pd.DataFrame.from_records(block, columns=columns),
+                   min(1.0, done / total) if total else 0.0)
+    finally:
+        wb.close()
+
 def guess_role(colname: str) -> str | None:
     c = colname.lower()
     if any(k in c for k in ("fecha","date","posted")): return "date"
@@ -19,7 +92,17 @@ def guess_role(colname: str) -> str | None:
     if any(k in c for k in ("moneda","currency")): return "currency"
     return None
 
+def guess_mapping(columns) -> Dict[str, str]:
+    """Asigna a cada rol la primera columna cuyo nombre lo sugiere."""
+    mapping: Dict[str, str] = {}
+    for col in columns:
+        role = guess_role(str(col))
+        if role and role not in mapping:
+            mapping[role] = col
+    return mapping
+
 def normalize_with_mapping(df, mapping: Dict[str,str|None], defaults: Dict[str,str]) -> pd.DataFrame:
+    import pandas as pd
     out = pd.DataFrame()
     # Fecha
     col_date = mapping.get("date")
@@ -33,9 +116,9 @@ def normalize_with_mapping(df, mapping: Dict[str,str|None], defaults: Dict[str,s
     # Monto
     col_amt = mapping.get("amount")
     if col_amt:
-        out["amount"] = df[col_amt].apply(lambda x: parse_amount(str(x)))
+        out["amount"] = parse_amount_cents_series(df[col_amt])
     else:
-        out["amount"] = 0.0
+        out["amount"] = 0
     # Moneda
     col_curr = mapping.get("currency")
     out["currency"] = (df[col_curr].astype(str) if col_curr else defaults.get("currency","ARS"))
@@ -43,27 +126,297 @@ def normalize_with_mapping(df, mapping: Dict[str,str|None], defaults: Dict[str,s
     out = out.dropna(subset=["posted_at"])
     return out
 
-def import_rows(conn, df) -> Tuple[int,int]:
-    """Crea cuentas faltantes por 'name' y carga transacciones."""
+@dataclass
+class ImportReport:
+    accounts: int = 0        # cuentas distintas del archivo
+    inserted: int = 0        # transacciones nuevas
+    skipped: int = 0         # ya estaban (misma huella): no se insertan
+    seconds: float = 0.0
+    undated: int = 0         # sin fecha válida (import_partitioned no sabe dónde van)
+    partitions: dict[str, "ImportReport"] = field(default_factory=dict)
+
+    def __iter__(self):
+        # Compatibilidad: cuentas, insertadas = import_rows(...)
+        yield self.accounts
+        yield self.inserted
+
+    def __str__(self):
+        rate = self.inserted / self.seconds if self.seconds else 0
+        return (f"{self.inserted} transacciones nuevas, {self.skipped} ya importadas, "
+                f"{self.accounts} cuentas, {self.seconds:.2f} s ({rate:,.0f} filas/s)")
+
+def _resolve_accounts(cur, names) -> dict[str, int]:
+    """
+    Devuelve {nombre: id} para todas las cuentas de 'names', creando en una
+    sola sentencia las que falten (institución 1 o la primera que exista).
+    """
+    names = json.dumps(sorted(names))
+    missing = cur.execute("""
+        SELECT COUNT(*) FROM json_each(?) j
+        WHERE NOT EXISTS (SELECT 1 FROM account a WHERE a.name = j.value)
+    """, (names,)).fetchone()[0]
+    if missing:
+        inst = cur.execute("SELECT id FROM institution ORDER BY id LIMIT 1").fetchone()
+        inst_id = inst[0] if inst else 1
+        cur.execute("INSERT OR IGNORE INTO institution(id,name) VALUES (?,?)", (inst_id, "Genérica"))
+        cur.execute("""
+            INSERT INTO account(institution_id,name,type,currency,metadata)
+            SELECT ?, j.value, 'wallet', 'ARS', '{"position": 999999999}'
+            FROM json_each(?) j
+            WHERE NOT EXISTS (SELECT 1 FROM account a WHERE a.name = j.value)
+            ORDER BY j.key
+        """, (inst_id, names))
+    return dict(cur.execute("""
+        SELECT a.name, MIN(a.id) FROM account a
+        WHERE a.name IN (SELECT value FROM json_each(?))
+        GROUP BY a.name
+    """, (names,)).fetchall())
+
+class _Apariciones:
+    """
+    Cuántas veces apareció cada combinación (cuenta, fecha, monto,
+    descripción) en el archivo que se está importando. Vive en una base
+    SQLite temporal en disco y no en un dict: con extractos de millones de
+    filas distintas la memoria queda acotada al bloque y al caché de páginas.
+    El archivo se borra al cerrar.
+    """
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix="import-apariciones-", suffix=".db")
+        os.close(fd)
+        self.con = sqlite3.connect(self.path)
+        self.con.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -4000;
+            CREATE TABLE aparicion(h INTEGER PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID;
+        """)
+
+    def contar(self, bases: list[int]) -> list[int]:
+        """Número de aparición (1, 2, ...) de cada base, sumando las de bloques anteriores."""
+        previas = dict(self.con.execute(
+            "SELECT h, n FROM aparicion WHERE h IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(set(bases))),)))
+        out = []
+        for base in bases:
+            n = previas[base] = previas.get(base, 0) + 1
+            out.append(n)
+        self.con.executemany(
+            "INSERT INTO aparicion(h, n) VALUES (?, ?) ON CONFLICT(h) DO UPDATE SET n = excluded.n",
+            previas.items())
+        self.con.commit()
+        return out
+
+    def close(self) -> None:
+        self.con.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _fingerprints(accounts, dates, amounts, descriptions, apariciones: _Apariciones) -> list[int]:
+    """
+    Huella de cada fila: hash de 64 bits de (cuenta, fecha, monto al
+    centavo, descripción normalizada) y del número de aparición de esa misma
+    combinación en el archivo, para no fusionar movimientos repetidos
+    legítimos (dos cafés iguales el mismo día). 'apariciones' lleva la
+    cuenta entre bloques de un mismo archivo.
+    """
+    blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+    keys, bases = [], []
+    for acc, day, amt, desc in zip(accounts, dates, amounts, descriptions):
+        key = f"{acc}\x1f{day}\x1f{format_cents(amt)}\x1f{' '.join(str(desc).casefold().split())}".encode("utf-8")
+        keys.append(key)
+        bases.append(from_bytes(blake2b(key, digest_size=8).digest(), "big", signed=True))
+    out = bases
+    for i, n in enumerate(apariciones.contar(bases)):
+        if n > 1:
+            out[i] = from_bytes(blake2b(keys[i] + b"\x1f%d" % n, digest_size=8).digest(), "big", signed=True)
+    return out
+
+def import_rows(conn, df, chunk_rows: int = IMPORT_CHUNK_ROWS,
+                apariciones: _Apariciones | None = None) -> ImportReport:
+    """
+    Crea cuentas faltantes por 'name' y carga transacciones en bloque:
+    las columnas se pasan a tuplas una sola vez y se insertan con
+    executemany, confirmando cada 'chunk_rows' filas.
+    Cada fila lleva su huella (_fingerprints); las que ya están en la base
+    se saltean, así reimportar el mismo extracto no duplica nada.
+    """
+    t0 = time.perf_counter()
     cur = conn.cursor()
-    # Map account name -> id (y crear si no existe, asignando institution 1 o nula)
-    acc_map = {}
-    for acc_name in df["account"].dropna().unique():
-        r = cur.execute("SELECT id FROM account WHERE name=?", (acc_name,)).fetchone()
-        if r: acc_map[acc_name] = r[0]
-        else:
-            inst = cur.execute("SELECT id FROM institution ORDER BY id LIMIT 1").fetchone()
-            inst_id = inst[0] if inst else 1
-            cur.execute("INSERT OR IGNORE INTO institution(id,name) VALUES (?,?)", (inst_id, "Genérica") )
-            cur.execute("INSERT INTO account(institution_id,name,type,currency,metadata) VALUES (?,?,?,?,?)",
-                        (inst_id, acc_name, "wallet", "ARS", '{"position": 999999999}'))
-            acc_map[acc_name] = cur.lastrowid
+    acc_map = _resolve_accounts(cur, df["account"].dropna().unique().tolist())
+    conn.commit()
+
+    n = len(df)
+    def column(name, default):
+        if name not in df.columns:
+            return [default] * n
+        return df[name].tolist()
+    accounts = df["account"].tolist()
+    account_ids = [acc_map.get(a) for a in accounts]
+    dates = df["posted_at"].tolist()
+    descriptions = [d or "" for d in column("description", "")]
+    amounts = df["amount"].astype("int64").tolist()
+    if "fingerprint" in df.columns:
+        fingerprints = df["fingerprint"].tolist()
+    elif apariciones is not None:
+        fingerprints = _fingerprints(accounts, dates, amounts, descriptions, apariciones)
+    else:
+        with _Apariciones() as propias:
+            fingerprints = _fingerprints(accounts, dates, amounts, descriptions, propias)
+    rows = zip(account_ids, dates, descriptions, amounts, column("currency", "ARS"), fingerprints)
+
     inserted = 0
-    for _,row in df.iterrows():
-        aid = acc_map.get(row["account"])
-        cur.execute(
-            "INSERT INTO transactions(account_id, posted_at, description, amount, currency) VALUES (?,?,?,?,?)",
-            (aid, row["posted_at"], row.get("description","") or "", float(row["amount"]), row.get("currency","ARS"))
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            break
+        cur.executemany(
+            "INSERT INTO transactions(account_id, posted_at, description, amount, currency, fingerprint) "
+            "VALUES (?,?,?,?,?,?) ON CONFLICT(fingerprint) DO NOTHING",
+            chunk,
         )
-        inserted += 1
-    return (len(acc_map), inserted)
+        conn.commit()
+        inserted += cur.rowcount
+    return ImportReport(len(acc_map), inserted, n - inserted, time.perf_counter() - t0)
+
+def import_dataframe(db_path: Path, df, chunk_rows: int = IMPORT_CHUNK_ROWS) -> ImportReport:
+    """Importa un DataFrame normalizado en la base 'db_path' (perfil bulk-import)."""
+    ensure_schema(db_path)
+    with connect(db_path, profile="bulk-import") as con:
+        return import_rows(con, df, chunk_rows)
+
+def import_file(db_path: Path, path: Path, mapping: Dict[str, str | None] | None = None,
+                defaults: Dict[str, str] | None = None, chunk_rows: int = IMPORT_CHUNK_ROWS,
+                sheet: str | None = None, header_row: int = 0,
+                on_progress: Callable[[ImportReport, float], None] | None = None) -> ImportReport:
+    """
+    Importa un CSV/Excel en modo streaming: cada bloque de 'chunk_rows' filas
+    se normaliza e inserta apenas se lee, así la memoria queda acotada al
+    tamaño del bloque y no al del archivo. Sin 'mapping' se adivina por los
+    nombres de columna. on_progress(reporte_parcial, fracción) tras cada bloque.
+    """
+    t0 = time.perf_counter()
+    defaults = defaults or {}
+    report = ImportReport()
+    accounts: set[str] = set()
+    ensure_schema(db_path)
+    with connect(db_path, profile="bulk-import") as con, _Apariciones() as apariciones:
+        for chunk, fraction in iter_table_chunks(path, chunk_rows, sheet, header_row):
+            if mapping is None:
+                mapping = guess_mapping(chunk.columns)
+            df = normalize_with_mapping(chunk, mapping, defaults)
+            part = import_rows(con, df, chunk_rows, apariciones)
+            accounts.update(df["account"].dropna().unique().tolist())
+            report.inserted += part.inserted
+            report.skipped += part.skipped
+            report.accounts = len(accounts)
+            report.seconds = time.perf_counter() - t0
+            if on_progress:
+                on_progress(report, fraction)
+    report.seconds = time.perf_counter() - t0
+    return report
+
+# --- Importación por partición (data/YYYY-MM.db o data/YYYY.db) ---
+_PARTITION_KEY = {"month": re.compile(r"(\d{4}-\d{2})-\d{2}"), "year": re.compile(r"(\d{4})-\d{2}-\d{2}")}
+
+def partition_keys(posted_at: pd.Series, granularity: str = "month") -> pd.Series:
+    """'YYYY-MM' (o 'YYYY') de cada fecha ISO; NaN si la fecha no es válida."""
+    pattern = _PARTITION_KEY.get(granularity)
+    if pattern is None:
+        raise ValueError(f"Granularidad inválida: {granularity!r} (usar 'month' o 'year')")
+    return posted_at.astype(str).str.extract(pattern, expand=False)
+
+def _import_partition(db_path: Path, df, chunk_rows: int) -> ImportReport:
+    """Carga un grupo ya preparado (esquema, core y huellas) en su partición."""
+    with connect(db_path, profile="bulk-import") as con:
+        return import_rows(con, df, chunk_rows)
+
+def import_partitioned(path: Path, mapping: Dict[str, str | None] | None = None,
+                       defaults: Dict[str, str] | None = None, data_dir: Path | None = None,
+                       granularity: str = "month", chunk_rows: int = IMPORT_CHUNK_ROWS,
+                       processes: int = 0, sheet: str | None = None, header_row: int = 0,
+                       on_progress: Callable[[ImportReport, float], None] | None = None
+                       ) -> ImportReport:
+    """
+    Como import_file, pero cada fila va a la base de su mes ('month':
+    data/YYYY-MM.db) o de su año ('year': data/YYYY.db), en una sola pasada.
+    Las cuentas nuevas se crean primero en general.db y cada partición
+    recibe esquema y core una sola vez por importación (de nuevo solo si
+    aparecen cuentas nuevas). Con processes > 1, los grupos de cada bloque
+    se cargan en paralelo, un proceso por partición.
+    El reporte suma todo y detalla 'partitions' por clave ('2024-03').
+    """
+    t0 = time.perf_counter()
+    data_dir = Path(data_dir or DATA_DIR)
+    gen_path = data_dir / "general.db"
+    defaults = defaults or {}
+    report = ImportReport()
+    accounts: set[str] = set()
+    prepared: set[str] = set()
+    partition_accounts: dict[str, set[str]] = {}
+    apariciones = _Apariciones()
+    pool = None
+    if processes > 1:
+        # spawn: un fork heredaría las conexiones abiertas del pool
+        pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        ensure_schema(gen_path)
+        for chunk, fraction in iter_table_chunks(path, chunk_rows, sheet, header_row):
+            if mapping is None:
+                mapping = guess_mapping(chunk.columns)
+            df = normalize_with_mapping(chunk, mapping, defaults)
+            keys = partition_keys(df["posted_at"], granularity)
+            # len(chunk): según la versión de pandas, normalize ya descarta las NaT
+            report.undated += len(chunk) - int(keys.notna().sum())
+            df = df[keys.notna()]
+            keys = keys[keys.notna()]
+
+            names = set(df["account"].dropna().unique().tolist()) - accounts
+            if names:
+                with connect(gen_path, profile="bulk-import") as con:
+                    _resolve_accounts(con.cursor(), names)
+                accounts |= names
+                prepared.clear()  # el core cambió: volver a sincronizar
+            df = df.assign(fingerprint=_fingerprints(
+                df["account"].tolist(), df["posted_at"].tolist(),
+                df["amount"].astype("int64").tolist(), df["description"].tolist(), apariciones))
+
+            jobs = []
+            for key, group in df.groupby(keys, sort=True):
+                target = data_dir / f"{key}.db"
+                if key not in prepared:
+                    sync_core_from_general(target, gen_path)
+                    prepared.add(key)
+                if pool is not None:
+                    jobs.append((key, pool.submit(_import_partition, target, group, chunk_rows)))
+                else:
+                    jobs.append((key, _import_partition(target, group, chunk_rows)))
+            for key, job in jobs:
+                part = job.result() if pool is not None else job
+                total = report.partitions.setdefault(key, ImportReport())
+                names = partition_accounts.setdefault(key, set())
+                names.update(df.loc[keys == key, "account"].dropna().unique().tolist())
+                total.accounts = len(names)
+                total.inserted += part.inserted
+                total.skipped += part.skipped
+                total.seconds += part.seconds
+                report.inserted += part.inserted
+                report.skipped += part.skipped
+            report.accounts = len(accounts)
+            report.seconds = time.perf_counter() - t0
+            if on_progress:
+                on_progress(report, fraction)
+    finally:
+        apariciones.close()
+        if pool is not None:
+            pool.shutdown()
+    report.seconds = time.perf_counter() - t0
+    return report
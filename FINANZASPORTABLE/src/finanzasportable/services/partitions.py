@@ -0,0 +1,137 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from pathlib import Path
+import heapq
+import re
+import sqlite3
+from .db import DATA_DIR, ensure_schema
+from .transactions import _filtros
+
+# Máximo de bases adjuntas por consulta si sqlite3 no informa el límite
+# (SQLITE_MAX_ATTACHED vale 10 en las compilaciones habituales).
+ATTACH_LIMIT = 10
+
+_PARTITION_RE = {"month": re.compile(r"\d{4}-\d{2}"), "year": re.compile(r"\d{4}")}
+
+def particiones(date_from=None, date_to=None, granularity: str = "month",
+                data_dir: Path | None = None) -> list[tuple[str, Path]]:
+    """
+    (clave, ruta) de las particiones existentes que pueden tener filas entre
+    date_from y date_to (ISO, inclusive): 'month' usa data/YYYY-MM.db y
+    'year' data/YYYY.db. Un trimestre con 'month' devuelve solo 3 archivos.
+    """
+    pattern = _PARTITION_RE.get(granularity)
+    if pattern is None:
+        raise ValueError(f"Granularidad inválida: {granularity!r} (usar 'month' o 'year')")
+    width = 7 if granularity == "month" else 4
+    lo = str(date_from)[:width] if date_from else None
+    hi = str(date_to)[:width] if date_to else None
+    out = []
+    for path in sorted(Path(data_dir or DATA_DIR).glob("*.db")):
+        key = path.stem
+        if not pattern.fullmatch(key):
+            continue
+        if (lo and key < lo) or (hi and key > hi):
+            continue
+        out.append((key, path))
+    return out
+
+def _attach_limit(con: sqlite3.Connection) -> int:
+    try:
+        return max(1, con.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED))
+    except AttributeError:  # Python < 3.11
+        return ATTACH_LIMIT
+
+@contextmanager
+def _attached(con: sqlite3.Connection, batch: list[tuple[str, Path]]):
+    """Adjunta el lote como p0, p1, ... (solo lectura) y SIEMPRE los desadjunta."""
+    aliases = []
+    try:
+        for i, (_key, path) in enumerate(batch):
+            con.execute(f"ATTACH DATABASE ? AS p{i}", (f"{path.resolve().as_uri()}?mode=ro",))
+            aliases.append(f"p{i}")
+        yield aliases
+    finally:
+        for alias in aliases:
+            try:
+                con.execute(f"DETACH DATABASE {alias}")
+            except sqlite3.OperationalError:
+                pass
+
+def _por_lotes(parts: list[tuple[str, Path]], sql_parte: str, sql_total: str, params: list):
+    """
+    Ejecuta sql_total sobre el UNION ALL de sql_parte en cada partición,
+    adjuntando de a tantas bases como permita SQLite. sql_parte usa {p}
+    como alias de la base y su primer parámetro es la clave de partición.
+    Produce la lista de filas de cada lote.
+    """
+    for _key, path in parts:
+        ensure_schema(path)
+    con = sqlite3.connect(":memory:", uri=True)
+    con.row_factory = sqlite3.Row
+    try:
+        size = _attach_limit(con)
+        for start in range(0, len(parts), size):
+            batch = parts[start:start + size]
+            with _attached(con, batch) as aliases:
+                union = " UNION ALL ".join(sql_parte.format(p=a) for a in aliases)
+                args = [v for key, _path in batch for v in (key, *params)]
+                yield con.execute(sql_total.format(union=union), args).fetchall()
+    finally:
+        con.close()
+
+def movimientos(date_from=None, date_to=None, granularity: str = "month",
+                data_dir: Path | None = None, limit: int | None = None, **filtros):
+    """
+    Transacciones de todas las particiones del rango, de la más nueva a la
+    más vieja, con la clave de su partición ('particion') y el nombre de la
+    cuenta; sin los borrados, como listar_transacciones. Filtros como listar_transacciones: account_id, category_id, sign.
+    Los ids se repiten entre particiones: identificar por (particion, id).
+    """
+    where, params = _filtros(date_from=date_from, date_to=date_to, **filtros)
+    where.insert(0, "t.deleted_at IS NULL")
+    parte = f"""
+        SELECT ? AS particion, t.id, t.posted_at, t.description, t.amount,
+               t.account_id, a.name AS account_name
+        FROM {{p}}.transactions t JOIN {{p}}.account a ON a.id = t.account_id
+        WHERE {" AND ".join(where)}
+    """
+    total = "SELECT * FROM ({union}) ORDER BY posted_at DESC, id DESC"
+    if limit is not None:
+        total += f" LIMIT {int(limit)}"
+    parts = particiones(date_from, date_to, granularity, data_dir)
+    lotes = list(_por_lotes(parts, parte, total, params))
+    rows = list(heapq.merge(*lotes, key=lambda r: (r["posted_at"], r["id"]), reverse=True))
+    return rows if limit is None else rows[:limit]
+
+def saldos_por_cuenta(date_from=None, date_to=None, granularity: str = "month",
+                      data_dir: Path | None = None, **filtros) -> list[tuple[int, str, int, int]]:
+    """
+    (account_id, nombre, suma en centavos, movimientos) por cuenta en el
+    rango, sin los borrados. Cada lote agrega en SQLite y acá se suman los parciales.
+    """
+    where, params = _filtros(date_from=date_from, date_to=date_to, **filtros)
+    where.insert(0, "t.deleted_at IS NULL")
+    parte = f"""
+        SELECT ? AS particion, t.account_id, a.name AS account_name, t.amount
+        FROM {{p}}.transactions t JOIN {{p}}.account a ON a.id = t.account_id
+        WHERE {" AND ".join(where)}
+    """
+    total = """
+        SELECT account_id, account_name, SUM(amount) AS total, COUNT(*) AS n
+        FROM ({union}) GROUP BY account_id, account_name
+    """
+    acumulado: dict[tuple[int, str], list] = {}
+    parts = particiones(date_from, date_to, granularity, data_dir)
+    for rows in _por_lotes(parts, parte, total, params):
+        for r in rows:
+            acc = acumulado.setdefault((r["account_id"], r["account_name"]), [0, 0])
+            acc[0] += r["total"]
+            acc[1] += r["n"]
+    return sorted(((i, name, int(s), n) for (i, name), (s, n) in acumulado.items()),
+                  key=lambda r: (r[1], r[0]))
+
+def total_saldo(date_from=None, date_to=None, granularity: str = "month",
+                data_dir: Path | None = None, **filtros) -> int:
+    """Suma (centavos) de los movimientos vigentes de todas las particiones del rango."""
+    return sum(r[2] for r in saldos_por_cuenta(date_from, date_to, granularity, data_dir, **filtros))
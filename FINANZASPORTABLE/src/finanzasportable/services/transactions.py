@@ -1,17 +1,81 @@
 from __future__ import annotations
-from .db import connect
+from .db import connect, db_exists, ensure_schema
 
-def listar_transacciones(db_path):
-    """Devuelve las últimas 500 transacciones con nombre de cuenta."""
+PAGE_SIZE = 500
+
+# Filtro por signo del monto
+_SIGNOS = {"in": "t.amount > 0", "out": "t.amount < 0"}
+
+def _filtros(account_id=None, category_id=None, date_from=None, date_to=None, sign=None):
+    """Arma las condiciones WHERE (y sus parámetros) comunes a los listados."""
+    where, params = [], []
+    if account_id is not None:
+        where.append("t.account_id = ?"); params.append(account_id)
+    if category_id is not None:
+        where.append("t.category_id = ?"); params.append(category_id)
+    if date_from:
+        where.append("t.posted_at >= ?"); params.append(str(date_from))
+    if date_to:
+        where.append("t.posted_at <= ?"); params.append(str(date_to))
+    if sign is not None:
+        if sign not in _SIGNOS:
+            raise ValueError(f"Signo inválido: {sign!r} (usar 'in' u 'out')")
+        where.append(_SIGNOS[sign])
+    return where, params
+
+def listar_transacciones(db_path, after=None, page_size: int = PAGE_SIZE, skip: int = 0, **filtros):
+    """
+    Devuelve una página de transacciones con nombre de cuenta, de la más
+    nueva a la más vieja. 'after' es el cursor (posted_at, id) de la última
+    fila de la página anterior; sin cursor trae la primera página. 'skip'
+    saltea esa cantidad de filas después del cursor, para llegar a una página
+    lejana sin conocer su cursor (cuesta recorrer esas filas una vez).
+    Filtros: account_id, category_id, date_from, date_to, sign ('in'|'out').
+    Los movimientos borrados (deleted_at) no se listan, igual que en los saldos.
+    Usa el índice (posted_at DESC, id DESC), o el (account_id, posted_at DESC,
+    id DESC) si se filtra por cuenta: cada página cuesta lo mismo, sin OFFSET
+    ni ordenar. Una partición que todavía no existe no tiene movimientos.
+    """
+    if not db_exists(db_path):
+        return []
+    where, params = _filtros(**filtros)
+    where.insert(0, "t.deleted_at IS NULL")
+    if after is not None:
+        where.append("(t.posted_at, t.id) < (?, ?)")
+        params.extend(after)
+    sql = """
+        SELECT t.id,
+               t.posted_at,
+               t.description,
+               t.amount,
+               a.name AS account_name
+        FROM transactions t
+        JOIN account a ON a.id = t.account_id
+    """
+    sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY t.posted_at DESC, t.id DESC LIMIT ? OFFSET ?"
+    ensure_schema(db_path)
+    with connect(db_path) as con:
+        return con.execute(sql, (*params, int(page_size), int(skip))).fetchall()
+
+def siguiente_cursor(rows, page_size: int = PAGE_SIZE):
+    """Cursor para pedir la página siguiente, o None si 'rows' fue la última."""
+    if len(rows) < page_size:
+        return None
+    last = rows[-1]
+    return (last["posted_at"], last["id"])
+
+def contar_transacciones(db_path, **filtros) -> int:
+    """Cantidad de filas que listaría listar_transacciones con los mismos filtros."""
+    if not db_exists(db_path):
+        return 0
+    where, params = _filtros(**filtros)
+    where.insert(0, "t.deleted_at IS NULL")
+    sql = f"""
+        SELECT COUNT(*) FROM transactions t
+        JOIN account a ON a.id = t.account_id
+        WHERE {' AND '.join(where)}
+    """
+    ensure_schema(db_path)
     with connect(db_path) as con:
-        return con.execute("""
-            SELECT t.id,
-                   t.posted_at,
-                   t.description,
-                   t.amount,
-                   a.name AS account_name
-            FROM transactions t
-            JOIN account a ON a.id = t.account_id
-            ORDER BY t.posted_at DESC, t.id DESC
-            LIMIT 500
-        """).fetchall()
+        return con.execute(sql, params).fetchone()[0]
@@ -1,11 +1,43 @@
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import re
 
+# Los montos se guardan y se suman como enteros en centavos (unidades
+# menores); float/Decimal solo al leer texto y al mostrar.
+_CENT = Decimal("0.01")
+_MAX_CENTS = 2 ** 63 - 1  # INTEGER de SQLite / int64
+
+def _cents(d: Decimal, original) -> int:
+    if not d.is_finite():
+        raise ValueError(f"Monto inválido: {original}")
+    cents = int(d.quantize(_CENT, rounding=ROUND_HALF_UP).scaleb(2))
+    if abs(cents) > _MAX_CENTS:
+        raise ValueError(f"Monto fuera de rango: {original}")
+    return cents
+
 def parse_amount(s: str) -> float:
     """
     Acepta: "5.000,00" | "1,234.56" | "-1.200,50" | "$ 1.234,56" | "5000"
     Regresa float con signo correcto.
     """
+    return float(_parse_decimal(s))
+
+def parse_amount_cents(s: str) -> int:
+    """Como parse_amount, pero en centavos exactos (redondeo half-up a 2 decimales)."""
+    return _cents(_parse_decimal(s), s)
+
+def to_cents(value) -> int:
+    """int/float/Decimal en unidades → centavos (los float vía su repr, no su binario)."""
+    if isinstance(value, int):
+        return value * 100
+    return _cents(Decimal(str(value)), value)
+
+def format_cents(cents: int) -> str:
+    """Centavos → "-1234.56" sin pasar por float."""
+    sign = "-" if cents < 0 else ""
+    units, frac = divmod(abs(int(cents)), 100)
+    return f"{sign}{units}.{frac:02d}"
+
+def _parse_decimal(s) -> Decimal:
     if s is None: raise ValueError("Monto vacío")
     s = str(s).strip()
     if not s: raise ValueError("Monto vacío")
@@ -18,11 +50,51 @@ def parse_amount(s: str) -> float:
         # Formato ES sin miles: 1234,56
         s = s.replace(",", ".")
     try:
-        return float(Decimal(s))
+        return Decimal(s)
     except (InvalidOperation, ValueError):
         raise ValueError(f"Monto inválido: {s}")
 
-def money(x: float, currency: str = "ARS") -> str:
-    sign = "-" if (x is not None and x < 0) else ""
-    v = abs(x or 0.0)
-    return f"{sign}{currency} {v:,.2f}".replace(",", "_").replace(".", ",").replace("_",".")
+# --- Versión vectorizada (importador) ---
+# Una expresión regular reconoce las formas comunes que _parse_decimal
+# interpreta sin ambigüedad, rodeadas de espacios/'$':
+#   [+-]D+ | [+-]D+.DD | [+-]D+,DD | [+-]D.DDD...,DD
+# con hasta 13 dígitos enteros y 2 decimales (el float de pd.to_numeric,
+# redondeado a centavos, es exacto). Esas celdas se normalizan a '1234.56'
+# con operaciones de texto sobre la columna; el resto (ARS/USD, exponentes,
+# más decimales, 'nan', basura y errores) pasa por el parser escalar.
+_FAST_AMOUNT = r"[+-]?(?:[0-9]{1,13}(?:[.,][0-9]{1,2})?|[0-9]{1,3}(?:\.[0-9]{3}){1,3},[0-9]{2})"
+
+def parse_amount_cents_series(values):
+    """
+    parse_amount_cents vectorizado: Serie int64 de centavos, igual (y con el
+    mismo ValueError, en la primera celda inválida) que aplicar
+    parse_amount_cents(str(x)) a cada celda. Las celdas numéricas float se
+    toman por su texto (str), como en Excel.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if values.dtype.kind in "iu":
+        return values.astype("int64") * 100
+    if values.dtype.kind == "f" or pd.api.types.infer_dtype(values, skipna=False) != "string":
+        values = values.astype(str)
+    raw = values.to_numpy(dtype=object)
+    text = pd.Series(raw).str.strip(" $")
+    text = text[text.str.fullmatch(_FAST_AMOUNT).to_numpy()]
+    comma = text.str.contains(",", regex=False).to_numpy()
+    text[comma] = text[comma].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    numbers = np.full(len(raw), np.nan)
+    numbers[text.index] = pd.to_numeric(text, errors="coerce")
+
+    rejected = np.isnan(numbers)
+    out = np.rint(np.where(rejected, 0, numbers) * 100).astype("int64")
+    for i in np.flatnonzero(rejected):
+        out[i] = parse_amount_cents(raw[i])
+    return pd.Series(out, index=values.index)
+
+def money(cents: int, currency: str = "ARS") -> str:
+    """Centavos → "ARS 1.234,56" (formato ES), con aritmética entera."""
+    cents = int(cents or 0)
+    sign = "-" if cents < 0 else ""
+    units, frac = divmod(abs(cents), 100)
+    return f"{sign}{currency} {units:,}".replace(",", ".") + f",{frac:02d}"
@@ -0,0 +1,141 @@
+import pytest
+
+from finanzasportable.auth import service
+from finanzasportable.auth.models import Usuario
+from finanzasportable.auth.repository import RepositorioUsuarios
+from finanzasportable.auth.storage import AlmacenUsuarios
+from finanzasportable.auth.tokens import AlmacenTokens
+
+
+@pytest.fixture
+def repo(monkeypatch, tmp_path):
+    repo = RepositorioUsuarios()
+    monkeypatch.setattr(service, "REPOSITORIO", repo)
+    monkeypatch.setattr(service, "USUARIOS", repo.usuarios)
+    monkeypatch.setattr(service, "ALMACEN", AlmacenUsuarios(str(tmp_path / "users_db.json")))
+    monkeypatch.setattr(service, "TOKENS", AlmacenTokens(tmp_path / "tokens.db"))
+    return repo
+
+
+def test_indice_por_email_normalizado_e_ids_estables(repo):
+    t1 = service.registrar_usuario("Ana", "Ana@Example.com ", "clave")
+    service.registrar_usuario("Beto", "beto@example.com", "clave")
+    with pytest.raises(ValueError):
+        service.registrar_usuario("Otra Ana", "ana@example.COM", "x")
+
+    service.confirmar_cuenta(t1.token)
+    assert service.login("  ANA@example.com", "clave").id == "user-1"
+    with pytest.raises(ValueError):
+        service.login("ana@example.com", "mala")
+
+    # Borrar no libera el id: el siguiente no pisa al existente
+    repo.quitar("user-1")
+    service.registrar_usuario("Caro", "caro@example.com", "clave")
+    assert sorted(repo.usuarios) == ["user-2", "user-3"]
+    assert repo.por_email("ana@example.com") is None
+
+
+def test_repositorio_arranca_desde_usuarios_cargados():
+    u = Usuario(id="user-41", nombre="X", email="x@example.com", password_hash="h")
+    repo = RepositorioUsuarios({u.id: u})
+    assert repo.por_email("X@EXAMPLE.COM") is u
+    assert repo.nuevo_id() == "user-42"
+
+
+def test_emails_repetidos_de_archivos_viejos_no_impiden_cargar():
+    a = Usuario(id="user-1", nombre="A", email="Ana@example.com", password_hash="h")
+    b = Usuario(id="user-2", nombre="B", email="ana@example.com", password_hash="h")
+    repo = RepositorioUsuarios({a.id: a, b.id: b})
+    assert repo.por_email("ana@example.com") is b
+    assert repo.por_email("Ana@example.com") is a
+    assert repo.por_email("ANA@EXAMPLE.COM") is a
+    with pytest.raises(ValueError):
+        repo.agregar(Usuario(id=repo.nuevo_id(), nombre="C", email="ANA@example.com", password_hash="h"))
+    repo.quitar("user-1")
+    assert repo.por_email("Ana@example.com") is b
+
+
+def test_almacen_agrega_cambios_y_compacta(tmp_path):
+    path = str(tmp_path / "users_db.json")
+    almacen = AlmacenUsuarios(path, compactar_cada=3)
+    usuarios = {}
+    for i in (1, 2):
+        u = usuarios[f"user-{i}"] = Usuario(id=f"user-{i}", nombre=f"U{i}",
+                                           email=f"u{i}@example.com", password_hash="h")
+        almacen.guardar(u, usuarios)
+    assert not (tmp_path / "users_db.json").exists()
+    assert len((tmp_path / "users_db.json.log").read_text().splitlines()) == 2
+
+    # Un crash a mitad de línea no rompe la carga
+    with open(almacen.log_path, "a") as f:
+        f.write('{"op": "put", "id": "user-3", "u": {"nom')
+    assert sorted(AlmacenUsuarios(path).cargar()) == ["user-1", "user-2"]
+    assert len((tmp_path / "users_db.json.log").read_text().splitlines()) == 2
+
+    del usuarios["user-1"]
+    almacen.borrar("user-1", usuarios)  # tercer cambio: compacta
+    assert (tmp_path / "users_db.json.log").read_text() == ""
+    cargados = AlmacenUsuarios(path).cargar()
+    assert list(cargados) == ["user-2"] and cargados["user-2"].email == "u2@example.com"
+
+
+def test_hash_con_sal_y_rehash_de_hashes_heredados(repo, monkeypatch):
+    import hashlib
+    from finanzasportable.auth import hashing
+
+    monkeypatch.setitem(hashing.COSTO, hashing.ALGORITMO, hashing.COSTO_MIN[hashing.ALGORITMO])
+    h1, h2 = hashing.hash_password("clave"), hashing.hash_password("clave")
+    assert h1 != h2 and h1.startswith(hashing.ALGORITMO + "$")
+    assert hashing.verificar("clave", h1) and not hashing.verificar("otra", h1)
+
+    viejo = hashlib.sha256(b"clave").hexdigest()
+    repo.agregar(Usuario(id="user-1", nombre="Demo", email="demo@example.com",
+                         password_hash=viejo, estado=service.EstadoCuenta.ACTIVA))
+    usuario = service.login("demo@example.com", "clave")
+    assert usuario.password_hash != viejo and not usuario.necesita_rehash()
+    assert service.ALMACEN.cargar()["user-1"].verificar_password("clave")
+
+    # Solo un costo menor al vigente pide rehash; uno mayor se conserva
+    minimo = hashing.COSTO_MIN[hashing.ALGORITMO]
+    monkeypatch.setitem(hashing.COSTO, hashing.ALGORITMO, minimo * 2)
+    assert hashing.necesita_rehash(h1)
+    assert not hashing.necesita_rehash(hashing.hash_password("clave", costo=minimo * 4))
+    assert not hashing.verificar("clave", h1.rsplit("$", 1)[0] + "$no-es-base64!")
+    assert not hashing.verificar("clave", "scrypt$x$y")
+
+
+def test_calibrar_respeta_los_limites_y_no_baja_el_costo(monkeypatch, tmp_path):
+    from finanzasportable.auth import hashing
+
+    minimo = hashing.COSTO_MIN[hashing.ALGORITMO]
+    costo = hashing.calibrar(objetivo_s=0.0)
+    assert costo == minimo
+    monkeypatch.setitem(hashing.COSTO, hashing.ALGORITMO, minimo * 2)
+    monkeypatch.setattr(hashing, "COSTO_FILE", str(tmp_path / "hash_costo.json"))
+    hashing.calibrar(objetivo_s=0.0, aplicar=True)
+    assert hashing.COSTO[hashing.ALGORITMO] == minimo * 2 and not (tmp_path / "hash_costo.json").exists()
+
+    hashing.guardar_costo(minimo * 4, str(tmp_path / "hash_costo.json"))
+    monkeypatch.setitem(hashing.COSTO, hashing.ALGORITMO, minimo)
+    assert hashing.cargar_costo(str(tmp_path / "hash_costo.json")) == minimo * 4
+
+
+def test_tokens_persisten_entre_procesos_y_se_purgan(repo, tmp_path):
+    from datetime import datetime, timedelta
+    from finanzasportable.auth.models import TokenConfirmacion
+
+    token = service.registrar_usuario("Ana", "ana@example.com", "clave")
+    # Otro proceso: sin el usuario en memoria y con su propio almacén de tokens
+    repo.quitar("user-1")
+    otro = AlmacenTokens(tmp_path / "tokens.db")
+    assert otro.get(token.token).usuario_id == "user-1"
+    assert service.confirmar_cuenta(token.token).estado == service.EstadoCuenta.ACTIVA
+    with pytest.raises(ValueError):
+        service.confirmar_cuenta(token.token)
+
+    vencido = TokenConfirmacion.generar("user-9", horas_validez=-1)
+    otro.guardar(vencido)
+    otro.guardar(TokenConfirmacion.generar("user-9"))
+    assert len(otro) == 3
+    assert otro.purgar(datetime.utcnow() + timedelta(minutes=1)) == 2
+    assert len(otro) == 1 and otro.get(vencido.token) is None
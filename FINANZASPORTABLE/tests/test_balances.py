@@ -0,0 +1,40 @@
+from finanzasportable.services import db
+from finanzasportable.services.balances import (
+    listar_saldos_por_cuenta, total_saldo, reconstruir_saldos, verificar_saldos,
+)
+
+
+def _seed(path):
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (2, 1, 'Banco', 'checking')")
+
+
+def test_saldos_se_mantienen_con_triggers(tmp_path):
+    path = tmp_path / "2024-05.db"
+    _seed(path)
+    with db.connect(path) as con:
+        con.executemany(
+            "INSERT INTO transactions(account_id, posted_at, amount) VALUES (?,?,?)",
+            [(1, "2024-05-01", 10000), (1, "2024-05-02", -3050), (2, "2024-05-03", 5025)],
+        )
+        con.execute("UPDATE transactions SET deleted_at='2024-05-04' WHERE amount=-3050")
+        con.execute("UPDATE transactions SET account_id=1 WHERE amount=5025")
+    saldos = {r["name"]: r["balance"] for r in listar_saldos_por_cuenta(path)}
+    assert saldos == {"Caja": 15025, "Banco": 0}   # centavos
+    assert all(type(v) is int for v in saldos.values())
+
+    with db.connect(path) as con:
+        con.execute("UPDATE transactions SET deleted_at=NULL WHERE amount=-3050")
+        con.execute("DELETE FROM transactions WHERE amount=10000")
+    assert total_saldo(path) == 1975 and type(total_saldo(path)) is int
+    assert verificar_saldos(path) == []
+
+    with db.connect(path) as con:
+        con.execute("UPDATE account_balance SET balance=99900 WHERE account_id=1")
+    assert verificar_saldos(path) == [(1, 99900, 1975)]
+    reconstruir_saldos(path)
+    assert verificar_saldos(path) == []
+    db.close_all_connections()
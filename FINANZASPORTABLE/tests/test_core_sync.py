@@ -0,0 +1,28 @@
+from finanzasportable.services import db
+from finanzasportable.services.core_sync import sync_all
+
+
+def test_sync_all_en_paralelo_saltea_las_que_estan_al_dia(tmp_path):
+    gen = tmp_path / "general.db"
+    db.ensure_schema(gen)
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+    for month in range(1, 13):
+        db.ensure_schema(tmp_path / f"2024-{month:02d}.db")
+    (tmp_path / "2023.db").write_bytes(b"esto no es sqlite" * 100)
+
+    results = sync_all(tmp_path, workers=4)
+    assert [r.path.name for r in results] == ["2023.db"] + [f"2024-{m:02d}.db" for m in range(1, 13)]
+    assert results[0].error and not any(r.error for r in results[1:])
+    assert not any(r.skipped for r in results)
+
+    with db.connect(gen) as con:
+        con.execute("UPDATE account SET name='Efectivo' WHERE id=1")
+    db.sync_core_from_general(tmp_path / "2024-01.db", gen)
+    results = sync_all(tmp_path, workers=4)
+    assert [r.skipped for r in results[1:]] == [True] + [False] * 11
+    with db.connect(tmp_path / "2024-12.db") as con:
+        assert con.execute("SELECT name FROM account").fetchone()[0] == "Efectivo"
+    assert all(r.seconds >= 0 for r in results)
+    db.close_all_connections()
@@ -0,0 +1,276 @@
+import sqlite3
+import threading
+
+import pytest
+
+from finanzasportable.services import db
+
+# Esquema de las bases anteriores a la migración 5 (montos REAL en unidades)
+SCHEMA_REAL = db.SCHEMA.replace("amount INTEGER NOT NULL", "amount REAL NOT NULL")
+
+
+def test_connect_reutiliza_conexion_por_hilo(tmp_path):
+    path = tmp_path / "pool.db"
+    with db.connect(path) as c1:
+        pass
+    with db.connect(path) as c2:
+        pass
+    assert c1 is c2
+
+    otro = []
+    def worker():
+        with db.connect(path) as c:
+            otro.append(c)
+    t = threading.Thread(target=worker); t.start(); t.join()
+    assert otro[0] is not c1
+    db.close_all_connections()
+
+
+def test_connect_rollback_si_hay_excepcion(tmp_path):
+    path = tmp_path / "pool.db"
+    with db.connect(path) as con:
+        con.execute("CREATE TABLE t(x)")
+    with pytest.raises(RuntimeError):
+        with db.connect(path) as con:
+            con.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    with db.connect(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    db.close_all_connections()
+
+
+def test_connect_aplica_perfil_de_pragmas(tmp_path):
+    path = tmp_path / "perfil.db"
+    with db.connect(path) as con:
+        con.execute("CREATE TABLE t(x)")
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert con.execute("PRAGMA temp_store").fetchone()[0] == 2
+    with pytest.raises(sqlite3.OperationalError):
+        with db.connect(path, profile="read-only-report") as con:
+            con.execute("INSERT INTO t VALUES (1)")
+    with db.connect(path, profile="bulk-import") as con:
+        con.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(ValueError):
+        with db.connect(path, profile="turbo"):
+            pass
+    db.close_all_connections()
+
+
+def test_migraciones_fusionan_cuentas_y_crean_indices(tmp_path):
+    path = tmp_path / "2024-03.db"
+    with db.connect(path) as con:
+        con.executescript(db.SCHEMA)
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (2, 1, 'Caja', 'cash')")
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount) VALUES (2, '2024-03-01', 10)")
+
+    assert db.upgrade_all(tmp_path) == {path: db.SCHEMA_VERSION}
+    with db.connect(path) as con:
+        assert [r[0] for r in con.execute("SELECT id FROM account")] == [1]
+        assert con.execute("SELECT account_id FROM transactions").fetchone()[0] == 1
+        plan = " ".join(r[3] for r in con.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM account WHERE name='Caja'"))
+        assert "ux_account_name" in plan
+    db.close_all_connections()
+
+
+def test_migracion_no_fusiona_cuentas_de_otra_moneda(tmp_path):
+    path = tmp_path / "2024-03.db"
+    with db.connect(path) as con:
+        con.executescript(SCHEMA_REAL)
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.executemany("INSERT INTO account(id, institution_id, name, type, currency) VALUES (?, 1, 'Caja', 'cash', ?)",
+                        [(1, "ARS"), (2, "USD"), (3, "ARS")])
+        con.executemany("INSERT INTO transactions(account_id, posted_at, amount, currency) VALUES (?, '2024-03-01', ?, ?)",
+                        [(1, 10, "ARS"), (2, 7, "USD"), (3, 5, "ARS")])
+
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        assert [tuple(r) for r in con.execute("SELECT id, name, currency FROM account ORDER BY id")] == \
+            [(1, "Caja", "ARS"), (2, "Caja (2)", "USD")]
+        assert [tuple(r) for r in con.execute("SELECT account_id, balance FROM account_balance ORDER BY 1")] == \
+            [(1, 1500), (2, 700)]
+    db.close_all_connections()
+
+
+def test_migracion_pasa_montos_a_centavos(tmp_path):
+    path = tmp_path / "2024-03.db"
+    with db.connect(path) as con:
+        con.executescript(SCHEMA_REAL)
+        for version, script in enumerate(db.MIGRATIONS[:4], start=1):
+            con.executescript(f"BEGIN;\n{script}\nPRAGMA user_version={version};\nCOMMIT;")
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.executemany("INSERT INTO transactions(account_id, posted_at, amount, deleted_at) VALUES (1, '2024-03-01', ?, ?)",
+                        [(0.1, None), (0.2, None), (-1234.565, None), (99.99, "2024-03-02")])
+        con.execute("DELETE FROM transactions WHERE amount = 99.99")
+
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        assert [tuple(r) for r in con.execute("SELECT amount, typeof(amount) FROM transactions ORDER BY id")] == \
+            [(10, "integer"), (20, "integer"), (-123457, "integer")]
+        assert con.execute("SELECT balance FROM account_balance").fetchone()[0] == 10 + 20 - 123457
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount) VALUES (1, '2024-03-03', 5)")
+        assert con.execute("SELECT MAX(id) FROM transactions").fetchone()[0] == 5
+        assert con.execute("SELECT balance FROM v_balance_por_cuenta").fetchone()[0] == -123422
+    db.close_all_connections()
+
+
+def test_migracion_a_centavos_no_toca_montos_ya_enteros(tmp_path):
+    path = tmp_path / "2024-04.db"
+    with db.connect(path) as con:
+        con.executescript(db.SCHEMA)
+        for version, script in enumerate(db.MIGRATIONS[:4], start=1):
+            con.executescript(f"BEGIN;\n{script}\nPRAGMA user_version={version};\nCOMMIT;")
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount) VALUES (1, '2024-04-01', 12345)")
+
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        assert con.execute("SELECT amount FROM transactions").fetchone()[0] == 12345
+        assert con.execute("SELECT balance FROM account_balance").fetchone()[0] == 12345
+    db.close_all_connections()
+
+
+def test_ensure_schema_se_verifica_una_vez(tmp_path, monkeypatch):
+    path = tmp_path / "general.db"
+    calls = []
+    real_migrate = db.migrate
+    monkeypatch.setattr(db, "migrate", lambda con: calls.append(1) or real_migrate(con))
+
+    db.ensure_schema(path)
+    db.ensure_schema(path)
+    assert len(calls) == 1 and db.schema_verified(path)
+    assert db.db_empty_of_core_tables(path) is False
+
+    db.close_all_connections()
+    path.unlink()
+    assert not db.schema_verified(path)
+    db.ensure_schema(path)
+    assert len(calls) == 2
+    db.close_all_connections()
+
+
+def test_sync_core_incremental_propaga_renombres_y_bajas(tmp_path):
+    gen, mes = tmp_path / "general.db", tmp_path / "2024-05.db"
+    db.ensure_schema(gen)
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.executemany("INSERT INTO account(id, institution_id, name, type) VALUES (?, 1, ?, 'cash')",
+                        [(1, "Caja"), (2, "Banco"), (3, "Tarjeta")])
+    v1 = db.sync_core_from_general(mes, gen)
+    with db.connect(mes) as con:
+        assert con.execute("SELECT COUNT(*) FROM account").fetchone()[0] == 3
+        assert con.execute("SELECT COUNT(*) FROM core_changelog").fetchone()[0] == 0
+
+    with db.connect(gen) as con:
+        con.execute("UPDATE account SET name='Efectivo' WHERE id=1")
+        con.execute("DELETE FROM account WHERE id=3")
+        con.execute("INSERT INTO category(id, name, type) VALUES (1, 'Sueldo', 'IN')")
+        pendientes = con.execute("SELECT COUNT(*) FROM core_changelog WHERE version > ?", (v1,)).fetchone()[0]
+    assert pendientes == 3
+    assert db.sync_core_from_general(mes, gen) == v1 + 3
+    with db.connect(mes) as con:
+        assert dict(con.execute("SELECT id, name FROM account").fetchall()) == {1: "Efectivo", 2: "Banco"}
+        assert con.execute("SELECT name FROM category").fetchone()[0] == "Sueldo"
+        assert con.execute("SELECT version FROM core_sync_state").fetchone()[0] == v1 + 3
+        assert not [r for r in con.execute("PRAGMA database_list") if r[1] == "gen"]
+    db.close_all_connections()
+
+
+def test_sync_core_intercambio_de_nombres_y_bajas_con_movimientos(tmp_path):
+    gen, mes = tmp_path / "general.db", tmp_path / "2024-06.db"
+    db.ensure_schema(gen)
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.executemany("INSERT INTO account(id, institution_id, name, type) VALUES (?, 1, ?, 'cash')",
+                        [(1, "Caja"), (2, "Banco"), (3, "Tarjeta")])
+    v1 = db.sync_core_from_general(mes, gen)
+    with db.connect(mes) as con:
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount) VALUES (3, '2024-06-01', 700)")
+
+    with db.connect(gen) as con:
+        con.execute("UPDATE account SET name='X' WHERE id=1")
+        con.execute("UPDATE account SET name='Caja' WHERE id=2")
+        con.execute("UPDATE account SET name='Banco' WHERE id=1")
+        con.execute("DELETE FROM account WHERE id=3")
+    v2 = db.sync_core_from_general(mes, gen)
+    assert v2 == v1 + 4
+    with db.connect(mes) as con:
+        assert [tuple(r) for r in con.execute("SELECT id, name FROM account ORDER BY id")] == \
+            [(1, "Banco"), (2, "Caja"), (3, "Tarjeta (3)")]
+    from finanzasportable.services.transactions import listar_transacciones
+    assert [r["account_name"] for r in listar_transacciones(mes)] == ["Tarjeta (3)"]
+
+    # Una cuenta local con el nombre de un alta de la general: la marca no avanza
+    with db.connect(mes) as con:
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (50, 1, 'Ahorro', 'cash')")
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (4, 1, 'Ahorro', 'cash')")
+    assert db.sync_core_from_general(mes, gen) == v2
+    with db.connect(mes) as con:
+        assert con.execute("SELECT version FROM core_sync_state").fetchone()[0] == v2
+        con.execute("UPDATE account SET name='Ahorro local' WHERE id=50")
+    assert db.sync_core_from_general(mes, gen) == v2 + 1
+    with db.connect(mes) as con:
+        assert con.execute("SELECT name FROM account WHERE id=4").fetchone()[0] == "Ahorro"
+    db.close_all_connections()
+
+
+def test_sync_core_renumera_filas_locales_en_vez_de_pisarlas(tmp_path):
+    from finanzasportable.services.transactions import listar_transacciones
+
+    gen, mes = tmp_path / "general.db", tmp_path / "2024-07.db"
+    db.ensure_schema(gen)
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.executemany("INSERT INTO account(id, institution_id, name, type) VALUES (?, 1, ?, 'cash')",
+                        [(1, "Caja"), (2, "Banco")])
+    v1 = db.sync_core_from_general(mes, gen)
+    with db.connect(mes) as con:
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (3, 1, 'Efectivo', 'cash')")
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount) VALUES (3, '2024-07-01', 12345)")
+
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (3, 1, 'Ahorro', 'cash')")
+        con.execute("DELETE FROM account WHERE id=2")
+    assert db.sync_core_from_general(mes, gen) == v1 + 2
+    with db.connect(mes) as con:
+        cuentas = dict(con.execute("SELECT name, id FROM account").fetchall())
+        saldo = con.execute("SELECT balance FROM account_balance WHERE account_id = ?",
+                            (cuentas["Efectivo"],)).fetchone()[0]
+    assert cuentas["Ahorro"] == 3 and cuentas["Efectivo"] > 3 and "Banco" not in cuentas
+    assert saldo == 12345
+    assert [(r["account_name"], r["amount"]) for r in listar_transacciones(mes)] == [("Efectivo", 12345)]
+
+    # La general borra la id que la partición usaba antes: la fila local no se toca
+    with db.connect(gen) as con:
+        con.execute("DELETE FROM account WHERE id=3")
+    db.sync_core_from_general(mes, gen)
+    with db.connect(mes) as con:
+        assert {r[0] for r in con.execute("SELECT name FROM account")} == {"Caja", "Efectivo"}
+    db.close_all_connections()
+
+
+def test_particion_inexistente_se_lee_vacia_y_se_crea_al_escribir(tmp_path):
+    from finanzasportable.services.balances import listar_saldos_por_cuenta, total_saldo
+    from finanzasportable.services.transactions import contar_transacciones, listar_transacciones
+
+    gen, mes = tmp_path / "general.db", tmp_path / "2019-04.db"
+    db.ensure_schema(gen)
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (7, 1, 'Caja', 'cash')")
+
+    assert [tuple(r)[:4] for r in listar_saldos_por_cuenta(mes)] == [(7, "Caja", "ARS", 0)]
+    assert total_saldo(mes) == 0
+    assert listar_transacciones(mes) == [] and contar_transacciones(mes) == 0
+    assert db.core_source(mes) == gen
+    assert not mes.exists()
+
+    db.ensure_partition(mes)
+    with db.connect(mes) as con:
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount) VALUES (7, '2019-04-02', 5)")
+    assert db.core_source(mes) == mes
+    assert total_saldo(mes) == 5
+    db.close_all_connections()
@@ -0,0 +1,36 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from finanzasportable.utils.formats import (
+    format_cents, money, parse_amount_cents, parse_amount_cents_series, to_cents,
+)
+
+CASOS = [
+    "5.000,00", "-1.200,50", "$ 1.234,56", "5000", "1234,56", "12.5", "+3",
+    " -0,07 $", "1.2.3,45", "-.5,00", "1.234", "5.", ".5", "1e3",
+    "ARS 10,00", "USD -2.50", "nan", "123456789012345678", "  7  ",
+]
+
+
+def test_centavos_exactos():
+    assert parse_amount_cents("1234,565") == 123457
+    assert parse_amount_cents("-0,07 $") == -7
+    assert to_cents(0.1) + to_cents(0.2) == to_cents(0.3) == 30
+    assert to_cents(5) == 500
+    assert format_cents(-5) == "-0.05"
+    assert money(-123456789) == "-ARS 1.234.567,89"
+    for fuera in ("nan", "123456789012345678"):
+        with pytest.raises(ValueError):
+            parse_amount_cents(fuera)
+
+
+def test_parse_amount_cents_series_igual_a_parse_amount_cents():
+    casos = [x for x in CASOS if x not in ("nan", "123456789012345678")]
+    s = pd.Series(casos * 3)
+    assert list(parse_amount_cents_series(s)) == [parse_amount_cents(x) for x in s]
+    assert list(parse_amount_cents_series(pd.Series([1, 2.5, -3]))) == [100, 250, -300]
+    repetido = parse_amount_cents_series(pd.Series(["1,50", "ARS 2", "3"], index=[7, 7, 1]))
+    assert list(repetido.items()) == [(7, 150), (7, 200), (1, 300)]
+    with pytest.raises(ValueError, match="Monto inválido: 1,234.56"):
+        parse_amount_cents_series(pd.Series(["10,00", "1,234.56", "1.234,5"]))
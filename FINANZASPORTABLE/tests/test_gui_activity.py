@@ -0,0 +1,145 @@
+import pytest
+
+pytest.importorskip("ttkbootstrap")
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.gui_mp import (
+    VirtualActivity, borrar_movimientos, guardar_movimiento, listar_categorias, listar_cuentas,
+)
+from finanzasportable.services import db
+from finanzasportable.services.transactions import contar_transacciones, listar_transacciones
+
+
+class FakeTree:
+    """Lo mínimo de ttk.Treeview que usa VirtualActivity, sin display."""
+    def __init__(self, height=5):
+        self.height = height
+        self.items: dict[str, tuple] = {}
+        self.order: list[str] = []
+
+    def cget(self, _opt):
+        return self.height
+
+    def bind(self, *_args, **_kwargs):
+        pass
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.order.remove(iid)
+            del self.items[iid]
+
+    def insert(self, _parent, index, iid, values, tags):
+        self.order.insert(index, iid)
+        self.items[iid] = values
+
+    def item(self, iid, values, tags):
+        self.items[iid] = values
+
+    def move(self, iid, _parent, index):
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+
+class FakeScrollbar:
+    def configure(self, **_kwargs):
+        pass
+
+    def set(self, first, last):
+        self.view = (first, last)
+
+
+class FakeRunner:
+    """Guarda los pedidos y los resuelve cuando el test llama a run()."""
+    def __init__(self):
+        self.pending: dict[str, tuple] = {}
+
+    def submit(self, key, fn, *args, on_done=None, **_kwargs):
+        self.pending[key] = (fn, args, on_done)
+
+    def cancel(self, key):
+        self.pending.pop(key, None)
+
+    def run(self):
+        while self.pending:
+            key = next(iter(self.pending))
+            fn, args, on_done = self.pending.pop(key)
+            on_done(fn(*args))
+
+
+def test_virtual_activity_pide_solo_las_paginas_visibles(tmp_path, monkeypatch):
+    monkeypatch.setattr(VirtualActivity, "PAGE_SIZE", 100)
+    monkeypatch.setattr(VirtualActivity, "MAX_PAGES", 2)
+    path = tmp_path / "2024-09.db"
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.executemany(
+            "INSERT INTO transactions(account_id, posted_at, amount) VALUES (1, ?, ?)",
+            [(f"2024-09-{i % 30 + 1:02d}", i - 200) for i in range(450)],
+        )
+    todas = [str(r["id"]) for r in listar_transacciones(path, page_size=1000)]
+
+    tv, runner = FakeTree(height=5), FakeRunner()
+    va = VirtualActivity(tv, FakeScrollbar(), runner)
+    va.load(path, contar_transacciones(path), listar_transacciones(path, page_size=100))
+    assert tv.order == todas[:5] and not runner.pending
+
+    # Salto al medio: la tabla no cambia hasta que llega la página, que se
+    # pide desde el último cursor conocido (el de la página 1)
+    va.yview("moveto", 0.5)
+    assert va.offset == 225 and tv.order == todas[:5]
+    va.yview("moveto", 0.6)                       # reemplaza el pedido anterior
+    assert list(runner.pending) == ["activity-page"]
+    _fn, (_path, pedidas, _size), _cb = runner.pending["activity-page"]
+    assert [(k, skip) for k, (_c, skip) in pedidas.items()] == [(2, 100)]
+    runner.run()
+    assert tv.order == todas[270:275]
+
+    # Una ventana entre dos páginas pide solo la que falta, ya con su cursor
+    va.yview("moveto", 298 / 450)
+    _fn, (_path, pedidas, _size), _cb = runner.pending["activity-page"]
+    assert [(k, skip) for k, (_c, skip) in pedidas.items()] == [(3, 0)]
+    runner.run()
+    assert tv.order == todas[298:303]
+    assert sorted(va.pages) == [2, 3]             # buffer acotado a MAX_PAGES
+    assert len(tv.items) == 5
+    db.close_all_connections()
+
+
+def test_escrituras_crean_la_particion_fuera_del_hilo_de_tk(tmp_path):
+    gen, mes = tmp_path / "general.db", tmp_path / "2019-05.db"
+    db.ensure_schema(gen)
+    with db.connect(gen) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type, currency) VALUES (3, 1, 'Caja', 'cash', 'USD')")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:   # como TaskRunner
+        pool.submit(guardar_movimiento, mes, 3, "2019-05-02", "café", -350).result()
+    rows = listar_transacciones(mes)
+    assert [(r["description"], r["amount"], r["account_name"]) for r in rows] == [("café", -350, "Caja")]
+    with db.connect(mes) as con:
+        assert con.execute("SELECT currency FROM transactions").fetchone()[0] == "USD"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(borrar_movimientos, mes, [rows[0]["id"]]).result()
+    assert listar_transacciones(mes) == []
+    db.close_all_connections()
+
+
+def test_listas_sin_general_no_crean_archivos(tmp_path):
+    mes = tmp_path / "2019-06.db"
+    assert listar_cuentas(mes) == [] and listar_categorias(mes) == []
+    assert list(tmp_path.iterdir()) == []
+
+    db.ensure_schema(tmp_path / "general.db")
+    with db.connect(tmp_path / "general.db") as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (2, 1, 'Caja', 'cash')")
+    assert listar_cuentas(mes) == [{"id": 2, "name": "Caja", "currency": "ARS"}]
+    assert not db.db_exists(mes)
+    db.close_all_connections()
@@ -0,0 +1,135 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from finanzasportable.services import db
+from finanzasportable.services.importer import import_dataframe, normalize_with_mapping
+
+MAPPING = {"date": "Fecha", "account": "Cuenta", "description": "Detalle", "amount": "Importe"}
+
+
+def _extracto(n):
+    return pd.DataFrame({
+        "Fecha": [f"2024-03-{1 + i % 28:02d}" for i in range(n)],
+        "Cuenta": ["Banco" if i % 3 else "Caja" for i in range(n)],
+        "Detalle": [f"mov {i}" for i in range(n)],
+        "Importe": ["1.000,50" if i % 2 else "-250,25" for i in range(n)],
+    })
+
+
+def test_import_dataframe_en_bloque(tmp_path):
+    path = tmp_path / "2024-03.db"
+    df = normalize_with_mapping(_extracto(1001), MAPPING, {"currency": "ARS"})
+    report = import_dataframe(path, df, chunk_rows=100)
+    assert (report.accounts, report.inserted) == (2, 1001)
+    cuentas, insertadas = report
+    assert (cuentas, insertadas) == (2, 1001)
+
+    with db.connect(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM account").fetchone()[0] == 2
+        total = con.execute("SELECT SUM(balance) FROM account_balance").fetchone()[0]
+    assert total == 500 * 100050 - 501 * 25025
+
+    # Una segunda carga reutiliza las cuentas existentes
+    assert import_dataframe(path, df).accounts == 2
+    with db.connect(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM account").fetchone()[0] == 2
+    db.close_all_connections()
+
+
+def test_import_file_por_bloques_csv_y_xlsx(tmp_path):
+    from finanzasportable.services.importer import import_file
+
+    df = _extracto(250)
+    csv = tmp_path / "extracto.csv"
+    df.to_csv(csv, index=False)
+    avances = []
+    report = import_file(tmp_path / "a.db", csv, chunk_rows=100,
+                         on_progress=lambda r, f: avances.append((r.inserted, f)))
+    assert (report.accounts, report.inserted) == (2, 250)
+    assert [n for n, _ in avances] == [100, 200, 250] and avances[-1][1] == 1.0
+
+    openpyxl = pytest.importorskip("openpyxl")
+    xlsx = tmp_path / "extracto.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        ws.append(list(row))
+    wb.save(xlsx)
+    report = import_file(tmp_path / "b.db", xlsx, MAPPING, chunk_rows=100)
+    assert report.inserted == 250
+    with db.connect(tmp_path / "a.db") as a, db.connect(tmp_path / "b.db") as b:
+        q = "SELECT posted_at, description, amount FROM transactions ORDER BY id"
+        assert [tuple(r) for r in a.execute(q)] == [tuple(r) for r in b.execute(q)]
+    db.close_all_connections()
+
+
+def test_reimportar_no_duplica(tmp_path):
+    from finanzasportable.services.importer import import_file
+
+    path = tmp_path / "2024-03.db"
+    df = _extracto(60)
+    df.loc[1] = df.loc[0]                      # movimiento repetido legítimo
+    csv = tmp_path / "marzo.csv"
+    df.to_csv(csv, index=False)
+    first = import_file(path, csv, MAPPING, chunk_rows=25)
+    assert (first.inserted, first.skipped) == (60, 0)
+
+    again = import_file(path, csv, MAPPING, chunk_rows=7)
+    assert (again.inserted, again.skipped) == (0, 60)
+
+    # Extracto superpuesto: la mitad ya estaba, con distinto espaciado/mayúsculas
+    extra = pd.concat([df.iloc[30:], _extracto(100).iloc[60:]])
+    extra["Detalle"] = extra["Detalle"].str.upper().str.replace(" ", "  ")
+    extra.to_csv(csv, index=False)
+    overlap = import_file(path, csv, MAPPING)
+    assert (overlap.inserted, overlap.skipped) == (40, 30)
+    with db.connect(path) as con:
+        assert con.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 100
+    db.close_all_connections()
+
+
+def test_apariciones_se_cuentan_entre_bloques_fuera_de_memoria():
+    import os
+    from finanzasportable.services.importer import _Apariciones, _fingerprints
+
+    with _Apariciones() as ap:
+        assert ap.contar([5, 7, 5]) == [1, 1, 2]
+        assert ap.contar([7, 5, 9]) == [2, 3, 1]
+        fila = (["Caja"], ["2024-03-01"], [-350], ["café"])
+        primera, segunda = _fingerprints(*fila, ap), _fingerprints(*fila, ap)
+        assert primera != segunda
+        assert os.path.exists(ap.path)
+    assert not os.path.exists(ap.path)
+
+
+def test_import_partitioned_por_mes(tmp_path):
+    from finanzasportable.services.importer import import_partitioned
+
+    df = _extracto(90)
+    df["Fecha"] = [f"2024-{1 + i % 3:02d}-{1 + i % 28:02d}" for i in range(90)]
+    df.loc[5, "Fecha"] = "sin fecha"
+    csv = tmp_path / "2024q1.csv"
+    df.to_csv(csv, index=False)
+    data = tmp_path / "data"
+
+    report = import_partitioned(csv, MAPPING, data_dir=data, chunk_rows=40)
+    assert (report.inserted, report.undated) == (89, 1)
+    assert sorted(report.partitions) == ["2024-01", "2024-02", "2024-03"]
+    assert sorted(p.name for p in data.glob("*.db")) == [
+        "2024-01.db", "2024-02.db", "2024-03.db", "general.db"]
+
+    # Las cuentas se crean en general y cada mes usa los mismos ids
+    with db.connect(data / "general.db") as con:
+        ids = dict(con.execute("SELECT name, id FROM account").fetchall())
+    with db.connect(data / "2024-02.db") as con:
+        assert dict(con.execute("SELECT name, id FROM account").fetchall()) == ids
+        fechas = {r[0][:7] for r in con.execute("SELECT posted_at FROM transactions")}
+    assert fechas == {"2024-02"}
+
+    again = import_partitioned(csv, MAPPING, data_dir=data, granularity="month")
+    assert (again.inserted, again.skipped) == (0, 89)
+    yearly = import_partitioned(csv, MAPPING, data_dir=data, granularity="year")
+    assert list(yearly.partitions) == ["2024"] and yearly.inserted == 89
+    db.close_all_connections()
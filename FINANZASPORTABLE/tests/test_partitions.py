@@ -0,0 +1,49 @@
+from finanzasportable.services import db
+from finanzasportable.services.partitions import (
+    particiones, movimientos, saldos_por_cuenta, total_saldo,
+)
+
+
+def _mes(data, year, month, montos):
+    path = data / f"{year}-{month:02d}.db"
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (2, 1, 'Banco', 'checking')")
+        con.executemany(
+            "INSERT INTO transactions(account_id, posted_at, amount) VALUES (?,?,?)",
+            [(1 + i % 2, f"{year}-{month:02d}-{1 + i:02d}", m) for i, m in enumerate(montos)],
+        )
+
+
+def test_consultas_entre_particiones(tmp_path):
+    data = tmp_path / "data"
+    # 14 meses: más que el límite de bases adjuntas, obliga a ir por lotes
+    meses = [(2023, m) for m in range(11, 13)] + [(2024, m) for m in range(1, 13)]
+    for year, month in meses:
+        _mes(data, year, month, [10000, -1050, 525])   # centavos
+    db.ensure_schema(data / "2024.db")  # otra granularidad: no se mezcla
+    with db.connect(data / "2024-06.db") as con:   # borrado: no se lista ni suma
+        con.execute("INSERT INTO transactions(account_id, posted_at, amount, deleted_at) "
+                    "VALUES (1, '2024-06-20', 777, '2024-06-21')")
+
+    trimestre = particiones("2024-01-15", "2024-03-31", data_dir=data)
+    assert [k for k, _ in trimestre] == ["2024-01", "2024-02", "2024-03"]
+    assert [k for k, _ in particiones("2024-01-01", "2024-12-31", "year", data)] == ["2024"]
+
+    rows = movimientos(data_dir=data)
+    assert len(rows) == 42 and all(r["amount"] != 777 for r in rows)
+    assert [r["posted_at"] for r in rows] == sorted((r["posted_at"] for r in rows), reverse=True)
+    assert rows[0]["particion"] == "2024-12"
+
+    rows = movimientos("2024-02-02", "2024-03-31", data_dir=data, account_id=1)
+    assert [(r["particion"], r["posted_at"]) for r in rows] == [
+        ("2024-03", "2024-03-03"), ("2024-03", "2024-03-01"), ("2024-02", "2024-02-03")]
+    assert len(movimientos(data_dir=data, limit=5)) == 5
+
+    saldos = saldos_por_cuenta("2024-01-01", "2024-12-31", data_dir=data)
+    assert saldos == [(2, "Banco", -12600, 12), (1, "Caja", 126300, 24)]
+    assert all(type(s[2]) is int for s in saldos)
+    assert total_saldo(data_dir=data) == 9475 * 14
+    db.close_all_connections()
@@ -9,4 +9,4 @@ def test_services_smoke():
     tot = total_saldo(db)
     assert isinstance(tx, list)
     assert isinstance(bal, list)
-    assert isinstance(tot, float)
+    assert isinstance(tot, int)
@@ -0,0 +1,88 @@
+import pytest
+
+from finanzasportable.services import db
+from finanzasportable.services.transactions import (
+    contar_transacciones, listar_transacciones, siguiente_cursor,
+)
+
+
+def test_paginacion_por_cursor_recorre_todo_sin_repetir(tmp_path):
+    path = tmp_path / "2024-06.db"
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.executemany(
+            "INSERT INTO transactions(account_id, posted_at, amount) VALUES (1, ?, ?)",
+            [(f"2024-06-{i % 30 + 1:02d}", (i % 7) - 3) for i in range(1234)],
+        )
+        esperado = [r[0] for r in con.execute(
+            "SELECT id FROM transactions ORDER BY posted_at DESC, id DESC")]
+
+    vistos, cursor = [], None
+    while True:
+        rows = listar_transacciones(path, after=cursor, page_size=100)
+        vistos += [r["id"] for r in rows]
+        cursor = siguiente_cursor(rows, page_size=100)
+        if cursor is None:
+            break
+    assert vistos == esperado
+
+    rows = listar_transacciones(path, sign="out", date_from="2024-06-10", date_to="2024-06-12")
+    assert rows and all(r["amount"] < 0 and "2024-06-10" <= r["posted_at"] <= "2024-06-12" for r in rows)
+    with pytest.raises(ValueError):
+        listar_transacciones(path, sign="neutro")
+    db.close_all_connections()
+
+
+def test_skip_permite_saltar_a_cualquier_pagina(tmp_path):
+    path = tmp_path / "2024-07.db"
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.execute("INSERT INTO account(id, institution_id, name, type) VALUES (1, 1, 'Caja', 'cash')")
+        con.executemany(
+            "INSERT INTO transactions(account_id, posted_at, amount) VALUES (1, ?, 1)",
+            [(f"2024-07-{i % 31 + 1:02d}",) for i in range(250)],
+        )
+    assert contar_transacciones(path) == 250
+    todas = listar_transacciones(path, page_size=250)
+    tercera = listar_transacciones(path, skip=200, page_size=100)
+    assert [r["id"] for r in tercera] == [r["id"] for r in todas[200:]]
+    segunda = listar_transacciones(path, page_size=100, skip=100)
+    desde_cursor = listar_transacciones(path, after=siguiente_cursor(segunda, 100), page_size=100)
+    assert [r["id"] for r in desde_cursor] == [r["id"] for r in tercera]
+    db.close_all_connections()
+
+
+def test_listado_por_cuenta_no_ordena_y_omite_borrados(tmp_path):
+    path = tmp_path / "2024-08.db"
+    db.ensure_schema(path)
+    with db.connect(path) as con:
+        con.execute("INSERT INTO institution(id, name) VALUES (1, 'Genérica')")
+        con.executemany("INSERT INTO account(id, institution_id, name, type) VALUES (?, 1, ?, 'cash')",
+                        [(1, "Caja"), (2, "Banco")])
+        con.executemany(
+            "INSERT INTO transactions(account_id, posted_at, amount) VALUES (?, ?, 1)",
+            [(1 + i % 2, f"2024-08-{i % 31 + 1:02d}") for i in range(200)],
+        )
+        con.execute("UPDATE transactions SET deleted_at = '2024-08-31' WHERE id = 1")
+
+    # Se captura la consulta real de la página y se mira su plan
+    with db.connect(path) as con:
+        sentencias = []
+        con.set_trace_callback(sentencias.append)
+        try:
+            rows = listar_transacciones(path, account_id=1, page_size=500)
+            listar_transacciones(path, after=(rows[10]["posted_at"], rows[10]["id"]), account_id=1)
+        finally:
+            con.set_trace_callback(None)
+        paginas = [s for s in sentencias if "ORDER BY t.posted_at" in s]
+        assert len(paginas) == 2
+        for sql in paginas:
+            plan = " ".join(r[3] for r in con.execute("EXPLAIN QUERY PLAN " + sql))
+            assert "ix_transactions_account_posted" in plan and "TEMP B-TREE" not in plan, plan
+
+    assert len(rows) == 99 and 1 not in [r["id"] for r in rows]
+    assert contar_transacciones(path, account_id=1) == 99
+    db.close_all_connections()